@@ -0,0 +1,101 @@
+"""Micro-benchmark of the document wrappers. Compares iteration and `Document.text` 
+with the previous token objects, created on every access with their attributes in an 
+instance dict, against the slotted token objects reused for each document.
+
+Usage: 
+    python -m benchmarks.performance.doc --n_tokens 100000
+"""
+import time
+import argparse
+import tracemalloc
+from typing import Callable, Tuple
+
+import spacy
+
+import nlpturk
+from nlpturk.doc import Document
+from nlpturk.pipeline.tokenizer import Tokenizer
+
+
+text = ('Sosyal medya hayatımıza hızlı girdi.ama yazım kurallarına dikkat eden pek yok :) '
+        'Ayrıntılar  www.nlpturk.ai adresinde (\n\tgüncel) "bilgiler" ile paylaşıldı. ')
+
+
+class DictToken:
+    """Previous token object, with an instance dict and created on every access.
+    """
+
+    def __init__(self, token):
+        self._token = token
+        self.i = token.i
+
+    @property
+    def text(self):
+        return self._token.text
+
+    @property
+    def text_with_ws(self):
+        doc = self._token.doc
+        start = int(doc._.idx[self.i]) if self.i > 0 else 0
+        end = int(doc._.idx[self.i]) + len(self._token) + int(doc._.ws[self.i])
+        return doc._.text[start:end]
+
+
+def measure(func: Callable[[], None], repeat: int = 5) -> Tuple[float, int]:
+    """Measure the best run time and the peak memory allocated by a function.
+
+    Args:
+        func (Callable[[], None]): Function to be measured.
+        repeat (int, optional): Number of runs. Defaults to 5.
+
+    Returns:
+        Tuple[float, int]: Run time in seconds and peak allocated memory in bytes.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(times), peak
+
+
+def main(n_tokens: int) -> None:
+    nlp = spacy.blank('tr')
+    nlp.tokenizer = Tokenizer(nlp)
+    nlp.max_length = 10**8
+    raw = text * max(1, n_tokens // len(nlp(text)))
+    doc = Document(nlpturk._align(nlp(' '.join(raw.split())), raw))
+    # token objects are created on first access
+    list(doc)
+
+    def iterate_new():
+        for token in doc._doc:
+            DictToken(token).text
+
+    def iterate_reused():
+        for token in doc:
+            token.text
+
+    def text_new():
+        ''.join(DictToken(t).text_with_ws for t in doc._doc)
+
+    def text_reused():
+        doc.text
+
+    print(f'{len(doc)} tokens')
+    print(f'{"":<20}{"dict objects":>35}{"reused slotted objects":>35}')
+    for name, new, reused in [('iteration', iterate_new, iterate_reused),
+                              ('Document.text', text_new, text_reused)]:
+        (t1, m1), (t2, m2) = measure(new), measure(reused)
+        print(f'{name:<20}{t1 / len(doc) * 1e9:>12.1f} ns/token{m1 / 1024:>10.0f} KiB'
+              f'{t2 / len(doc) * 1e9:>12.1f} ns/token{m2 / 1024:>10.0f} KiB')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_tokens', type=int, default=100000)
+    main(parser.parse_args().n_tokens)
@@ -0,0 +1,60 @@
+"""Import time benchmark of the package and the command-line interface, based on 
+`python -X importtime`. Fails if the import time exceeds the budget or if a heavy 
+dependency is imported eagerly.
+
+Usage: 
+    python -m benchmarks.performance.import_time --budget_ms 150
+"""
+import sys
+import argparse
+import subprocess
+from typing import Dict, Tuple
+
+
+# dependencies that must be imported on first use
+HEAVY = ('spacy', 'spacy_transformers', 'thinc', 'torch', 'numpy', 'sklearn', 'requests',
+         'nltk')
+
+
+def import_time(module: str) -> Tuple[int, Dict[str, Tuple[int, int]]]:
+    """Measure the import time of a module in a new interpreter.
+
+    Args:
+        module (str): Module name.
+
+    Returns:
+        Tuple[int, Dict[str, Tuple[int, int]]]: Cumulative import time of the module in 
+            microseconds, and self and cumulative import times of all imported modules.
+    """
+    res = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+                         capture_output=True, text=True, check=True)
+    times = {}
+    for line in res.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        times[name.strip()] = (int(self_us), int(cumulative_us))
+    return times[module][1], times
+
+
+def main(budget_ms: float, repeat: int) -> int:
+    failed = False
+    for module in ('nlpturk', 'nlpturk.__main__'):
+        # the best of the runs, to reduce the noise of cold caches
+        total, times = min((import_time(module) for _ in range(repeat)), key=lambda r: r[0])
+        heavy = sorted(m for m in times if m.split('.')[0] in HEAVY)
+        print(f'import {module}: {total / 1000:.1f} ms (budget {budget_ms:.1f} ms)')
+        for name, (self_us, _) in sorted(times.items(), key=lambda t: -t[1][0])[:10]:
+            print(f'  {self_us / 1000:>8.1f} ms  {name}')
+        if heavy:
+            print(f'  heavy dependencies imported: {", ".join(heavy)}')
+        failed = failed or total > budget_ms * 1000 or bool(heavy)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--budget_ms', type=float, default=150)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    sys.exit(main(args.budget_ms, args.repeat))
@@ -0,0 +1,56 @@
+"""Benchmark of the model load time. Compares the cold start of a model loaded by spaCy 
+with the model exported to the fast-load format, each in a new interpreter.
+
+Usage: 
+    python -m nlpturk export_fast --model_path path/to/model --output_path path/to/fast
+    python -m benchmarks.performance.load --model_path path/to/model --fast_path path/to/fast
+"""
+import sys
+import argparse
+import subprocess
+from pathlib import Path
+from typing import Union, Tuple
+
+
+_code = '''
+import time, resource
+start = time.perf_counter()
+import spacy
+from nlpturk import model
+nlp = model.load_fast({path!r}) if model.is_fast({path!r}) else spacy.load({path!r})
+print(time.perf_counter() - start, resource.getrusage(resource.RUSAGE_SELF).ru_maxrss)
+'''
+
+
+def load_time(model_path: Union[str, Path], repeat: int) -> Tuple[float, int]:
+    """Measure the load time of a model in new interpreters.
+
+    Args:
+        model_path (Union[str, Path]): Path to the model directory.
+        repeat (int): Number of runs.
+
+    Returns:
+        Tuple[float, int]: Best load time in seconds, and peak RSS in KiB.
+    """
+    runs = []
+    for _ in range(repeat):
+        res = subprocess.run([sys.executable, '-c', _code.format(path=str(model_path))],
+                             capture_output=True, text=True, check=True)
+        seconds, rss = res.stdout.split()
+        runs.append((float(seconds), int(rss)))
+    return min(runs)
+
+
+def main(model_path: Union[str, Path], fast_path: Union[str, Path], repeat: int) -> None:
+    for name, path in (('spacy.load', model_path), ('fast-load', fast_path)):
+        seconds, rss = load_time(path, repeat)
+        print(f'{name:<12}{seconds:>8.3f} s{rss / 1024:>10.1f} MiB peak RSS')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model_path', required=True)
+    parser.add_argument('--fast_path', required=True)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    main(args.model_path, args.fast_path, args.repeat)
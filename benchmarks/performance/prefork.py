@@ -0,0 +1,84 @@
+"""Benchmark of the memory shared by pre-forked workers on Linux. The model is loaded
+in the master process, with or without `nlpturk.preload`, and the forked workers
+process texts. Shared and private memory of each worker is reported, private memory
+grows as the pages of the model are written by the workers.
+
+The memory of running workers, e.g. gunicorn workers, can be reported by their
+process ids.
+
+Usage:
+    python -m benchmarks.performance.prefork --workers 4 --n_texts 1000
+    python -m benchmarks.performance.prefork --pids 1201 1202 1203
+"""
+import os
+import gc
+import signal
+import argparse
+from typing import Iterable
+
+import nlpturk
+from nlpturk.memory import memory_usage
+
+
+text = ('Sosyal medya hayatımıza hızlı girdi.ama yazım kurallarına dikkat eden pek yok :) '
+        'Ayrıntılar  www.nlpturk.ai adresinde (\n\tgüncel) "bilgiler" ile paylaşıldı. ')
+
+
+def report(pids: Iterable[int]) -> None:
+    """Print the memory usage of the processes.
+
+    Args:
+        pids (Iterable[int]): Process ids.
+    """
+    print(f'{"pid":>8}{"rss":>12}{"pss":>12}{"shared":>12}{"private":>12}  MiB')
+    total = 0
+    for pid in pids:
+        m = memory_usage(pid)
+        total += m['pss']
+        print(f'{pid:>8}' + ''.join(f'{m[k] / 1024:>12.1f}'
+                                    for k in ('rss', 'pss', 'shared', 'private')))
+    print(f'{"total":>8}{"":>12}{total / 1024:>12.1f}')
+
+
+def main(workers: int, n_texts: int, freeze: bool) -> None:
+    if freeze:
+        nlpturk.preload()
+    else:
+        nlpturk._load()
+        nlpturk(text)
+    pids, ready = [], []
+    for _ in range(workers):
+        r, w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(r)
+            for _ in nlpturk.pipe([text] * n_texts):
+                pass
+            gc.collect()
+            # report done and wait until the memory is measured
+            os.write(w, b'1')
+            signal.pause()
+            os._exit(0)
+        os.close(w)
+        pids.append(pid)
+        ready.append(r)
+    for r in ready:
+        os.read(r, 1)
+    print(f'gc.freeze: {freeze}')
+    report(pids)
+    for pid in pids:
+        os.kill(pid, signal.SIGKILL)
+        os.waitpid(pid, 0)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--n_texts', type=int, default=1000)
+    parser.add_argument('--no_freeze', action='store_true')
+    parser.add_argument('--pids', type=int, nargs='+')
+    args = parser.parse_args()
+    if args.pids:
+        report(args.pids)
+    else:
+        main(args.workers, args.n_texts, not args.no_freeze)
@@ -0,0 +1,63 @@
+"""Benchmark of the tokenizer on url-heavy social media text. Compares the url pattern 
+compiled on every call with the trie-based pattern compiled once.
+
+Usage: 
+    python -m benchmarks.performance.tokenizer --n_tokens 100000
+"""
+import time
+import argparse
+from typing import List
+
+import spacy
+
+from nlpturk.pipeline.tld import TLD
+from nlpturk.pipeline.tokenizer import Tokenizer, _url_pattern
+
+
+text = ('Yeni bölüm yayında 👉 https://youtu.be/xYz123 izleyin!! @nlpturk #nlp '
+        'detaylar:www.nlpturk.ai/blog?id=42 ve nlpturk.com.tr adresinde... '
+        'kampanya.link/indirim kodu:TR2023 sadece bugün!!! site.fake/x değil '
+        'bit.ly/3abcDEF (yorumlar) "paylaş" http:nlpturk.net mail@ornek.com.tr ')
+
+
+class PlainTokenizer(Tokenizer):
+    """Tokenizer that compiles the plain alternation of the domains on every call, 
+    as before the url pattern was precompiled.
+    """
+
+    def _is_url(self, text: str) -> bool:
+        return bool(_url_pattern('|'.join(TLD)).match(text))
+
+
+def tokens_per_sec(tokenizer: Tokenizer, texts: List[str], repeat: int) -> float:
+    """
+    Args:
+        tokenizer (Tokenizer): Tokenizer to be measured.
+        texts (List[str]): Texts to be tokenized.
+        repeat (int): Number of runs.
+
+    Returns:
+        float: Best throughput in tokens per second.
+    """
+    best = 0.0
+    for _ in range(repeat):
+        start, n = time.perf_counter(), 0
+        for t in texts:
+            n += len(tokenizer(t))
+        best = max(best, n / (time.perf_counter() - start))
+    return best
+
+
+def main(n_tokens: int, repeat: int) -> None:
+    nlp = spacy.blank('tr')
+    texts = [text] * max(1, n_tokens // len(Tokenizer(nlp)(text)))
+    for name, cls in (('compiled per call', PlainTokenizer), ('precompiled trie', Tokenizer)):
+        print(f'{name:<20}{tokens_per_sec(cls(nlp), texts, repeat):>12.0f} tokens/s')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_tokens', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+    main(args.n_tokens, args.repeat)
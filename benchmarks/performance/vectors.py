@@ -0,0 +1,67 @@
+"""Benchmark of the half precision vectors. Processes texts with `vector_dtype` set to 
+`float32` and `float16`, and compares the memory used by the token vectors of the 
+documents and the cosine similarities of the sentence and document vectors.
+
+Usage: 
+    python -m benchmarks.performance.vectors --data_path path/to/texts.txt
+"""
+import argparse
+from pathlib import Path
+from typing import List, Union
+
+import numpy as np
+
+import nlpturk
+from nlpturk.doc import Document
+
+
+def vector_bytes(doc: Document) -> int:
+    """Memory used by the token vectors of a document. The vectors of tok2vec models 
+    are the tensor of the document, they are counted once.
+
+    Args:
+        doc (Document): Document object, vectors are accessed before.
+
+    Returns:
+        int: Size of the token vectors in bytes.
+    """
+    return doc._get_vectors().nbytes
+
+
+def cosine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a, b = a.astype('float32'), b.astype('float32')
+    norm = np.linalg.norm(a, axis=-1) * np.linalg.norm(b, axis=-1)
+    # zero vectors, i.e. tokens without subtokens, are identical
+    return np.where(norm > 0, (a * b).sum(axis=-1) / np.maximum(norm, 1e-12), 1.0)
+
+
+def process(texts: List[str], dtype: str) -> List[Document]:
+    nlpturk.configure(vector_dtype=dtype)
+    docs = [doc for doc in nlpturk.pipe(texts) if len(doc)]
+    for doc in docs:
+        doc.vector
+    return docs
+
+
+def main(data_path: Union[str, Path]) -> None:
+    texts = [t for t in Path(data_path).read_text(encoding='utf-8').split('\n') if t.strip()]
+    docs32, docs16 = process(texts, 'float32'), process(texts, 'float16')
+
+    mem32 = sum(vector_bytes(doc) for doc in docs32)
+    mem16 = sum(vector_bytes(doc) for doc in docs16)
+    print(f'{len(docs32)} documents, {sum(len(doc) for doc in docs32)} tokens')
+    print(f'vector memory: float32 {mem32 / 1024**2:.1f} MiB, '
+          f'float16 {mem16 / 1024**2:.1f} MiB ({1 - mem16 / max(mem32, 1):.1%} saved)')
+
+    for name, get in [('token', lambda d: d._get_vectors()),
+                      ('sentence', lambda d: np.stack([s.vector for s in d.sents])),
+                      ('document', lambda d: d.vector[None])]:
+        drift = 1 - np.concatenate([cosine(get(a), get(b)) for a, b in zip(docs32, docs16)])
+        print(f'{name} cosine drift: mean {drift.mean():.2e}, max {drift.max():.2e}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data_path', required=True,
+                        help='Path to the text file, texts are separated by newlines.')
+    main(parser.parse_args().data_path)
@@ -0,0 +1,55 @@
+"""Soak test of the memory usage of a long-running process. Unique texts, e.g. words 
+with random suffixes, urls and hashtags, are processed and RSS is reported periodically, 
+with and without the `max_vocab_size` setting.
+
+Usage: 
+    python -m benchmarks.performance.vocab --n_texts 1000000 --max_vocab_size 100000
+    python -m benchmarks.performance.vocab --n_texts 1000000 --max_vocab_size 0
+"""
+import time
+import random
+import string
+import argparse
+from typing import Iterator
+
+import nlpturk
+from nlpturk.memory import memory_usage
+
+
+text = 'Sosyal medya {word} hayatımıza hızlı girdi. Ayrıntılar www.{word}.com adresinde #{word}'
+
+
+def unique_texts(n_texts: int, seed: int = 0) -> Iterator[str]:
+    """
+    Args:
+        n_texts (int): Number of texts.
+        seed (int, optional): Random seed. Defaults to 0.
+
+    Yields:
+        Iterator[str]: Texts with unique words.
+    """
+    rng = random.Random(seed)
+    for i in range(n_texts):
+        word = ''.join(rng.choices(string.ascii_lowercase, k=8)) + str(i)
+        yield text.format(word=word)
+
+
+def main(n_texts: int, max_vocab_size: int, interval: int) -> None:
+    nlpturk.configure(max_vocab_size=max_vocab_size)
+    nlpturk._load()
+    start = time.perf_counter()
+    print(f'{"texts":>10}{"strings":>12}{"rss MiB":>12}{"seconds":>10}')
+    for i, _ in enumerate(nlpturk.pipe(unique_texts(n_texts), batch_size=256), 1):
+        if i % interval == 0 or i == n_texts:
+            print(f'{i:>10}{len(nlpturk._nlp.vocab.strings):>12}'
+                  f'{memory_usage()["rss"] / 1024:>12.1f}'
+                  f'{time.perf_counter() - start:>10.1f}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n_texts', type=int, default=1000000)
+    parser.add_argument('--max_vocab_size', type=int, default=100000)
+    parser.add_argument('--interval', type=int, default=50000)
+    args = parser.parse_args()
+    main(args.n_texts, args.max_vocab_size, args.interval)
@@ -1,11 +1,6 @@
 import argparse
 import warnings
 
-from .utils import fetch_ud_treebanks, merge_ud_treebanks
-from .training.preprocess import convert
-from .training.train import train_model, evaluate_model
-from benchmarks.utils import run_benchmarks
-
 
 _cli_usage = 'Usage: python -m nlpturk [OPTIONS] COMMAND [ARGS]'
 
@@ -79,6 +74,38 @@ Commands:
               Optional arguments:  
                 --use_gpu      Flag indicates whether to use GPU during evaluation.
 
+  export_fast Export a trained model to the fast-load format. Weights are 
+              memory-mapped on load and shared by the processes on the same host.
+            
+              Required arguments:
+                --output_path  Path to the directory to save exported model.
+            
+              Optional arguments:
+                --model_path   Path to the trained model directory. Defaults to 
+                               the installed nlpTurk model.
+
+  serve       Serve annotations over HTTP. Texts are posted as JSON to `/annotate`, 
+              e.g. `{"texts": ["..."], "components": ["tagger"]}`, and tokens, 
+              lemmas, POS tags and sentence offsets are returned. Server status 
+              is available at `/health`.
+            
+              Optional arguments:
+                --host         Host to listen on. Defaults to 127.0.0.1.
+                --port         Port to listen on. Defaults to 8080.
+                --workers      Number of worker threads handling requests. 
+                               Defaults to 8.
+                --queue_limit  Maximum number of texts waiting to be processed. 
+                               Requests are rejected with 503 status when the 
+                               queue is full. Defaults to 1024.
+                --max_batch_tokens  
+                               Maximum number of tokens in a batch of texts 
+                               processed together. Defaults to 2048.
+                --max_wait     Maximum time in seconds to wait for a batch to 
+                               fill up. Defaults to 0.005.
+                --processes    Number of worker processes. The model is loaded 
+                               once and shared by the forked workers. 
+                               Defaults to 1.
+
   benchmark   Perform benchmarks.
             
               Required arguments:
@@ -132,7 +159,8 @@ class ArgumentParser(argparse.ArgumentParser):
 
 def cli():
     E01 = 'the following arguments are required: {}'
-    CMD = ['fetch_ud', 'merge_ud', 'preprocess', 'train', 'evaluate', 'benchmark']
+    CMD = ['fetch_ud', 'merge_ud', 'preprocess', 'train', 'evaluate', 'export_fast',
+           'serve', 'benchmark']
 
     parser = ArgumentParser()
     parser.add_argument('COMMAND', choices=CMD)
@@ -140,10 +168,13 @@ def cli():
 
     warnings.filterwarnings('ignore')
 
+    # dependencies of the commands are imported as needed to keep the startup fast
+
     kwargs = {}
     if args.COMMAND == 'fetch_ud':
         if not hasattr(args, 'output_path') or not args.output_path:
             parser.error(E01.format('--output_path'))
+        from .utils import fetch_ud_treebanks
         fetch_ud_treebanks(args.output_path)
     elif args.COMMAND == 'merge_ud':
         required = [a for a in ('data_path', 'output_path')
@@ -153,6 +184,7 @@ def cli():
         if hasattr(args, 'blacklist') and args.blacklist:
             kwargs['blacklist'] = args.blacklist if isinstance(args.blacklist, list) \
                 else [args.blacklist]
+        from .utils import merge_ud_treebanks
         merge_ud_treebanks(args.data_path, args.output_path, **kwargs)
     elif args.COMMAND == 'preprocess':
         required = [a for a in ('data_path', 'output_path')
@@ -161,6 +193,7 @@ def cli():
             parser.error(E01.format(', '.join([f'--{r}' for r in required])))
         if hasattr(args, 'split_ratios') and isinstance(args.split_ratios, list):
             kwargs['split_ratios'] = [float(r) for r in args.split_ratios]
+        from .training.preprocess import convert
         convert(args.data_path, args.output_path, **kwargs)
     elif args.COMMAND == 'train':
         required = [a for a in ('model_path', 'data_path')
@@ -178,6 +211,7 @@ def cli():
         for name in ['trf_model', 'vectors', 'source', 'checkpoint']:
             if hasattr(args, name) and getattr(args, name):
                 kwargs[name] = getattr(args, name)
+        from .training.train import train_model
         train_model(args.model_path, args.data_path, **kwargs)
     elif args.COMMAND == 'evaluate':
         required = [a for a in ('model_path', 'filepath', 'output_path')
@@ -186,12 +220,38 @@ def cli():
             parser.error(E01.format(', '.join([f'--{r}' for r in required])))
         if hasattr(args, 'use_gpu'):
             kwargs['use_gpu'] = True
+        from .training.train import evaluate_model
         evaluate_model(args.model_path, args.filepath, args.output_path, **kwargs)
+    elif args.COMMAND == 'export_fast':
+        if not hasattr(args, 'output_path') or not args.output_path:
+            parser.error(E01.format('--output_path'))
+        import nlpturk
+        from .model import export_fast
+        model_path = getattr(args, 'model_path', None) or nlpturk._model_path()
+        export_fast(model_path, args.output_path)
+    elif args.COMMAND == 'serve':
+        for name, type_ in [('host', str), ('port', int), ('workers', int),
+                            ('queue_limit', int), ('max_batch_tokens', int),
+                            ('max_wait', float), ('processes', int)]:
+            if not hasattr(args, name):
+                continue
+            value = getattr(args, name)
+            if value == '':
+                parser.error(f'argument --{name}: expected a value')
+            if isinstance(value, list):
+                parser.error(f'argument --{name}: expected a single value')
+            try:
+                kwargs[name] = type_(value)
+            except (TypeError, ValueError):
+                parser.error(f'invalid value for --{name}: {value}')
+        from .server import serve
+        serve(**kwargs)
     elif args.COMMAND == 'benchmark':
         required = [a for a in ('data_path', 'output_path')
                     if not hasattr(args, a) or not getattr(args, a)]
         if required:
             parser.error(E01.format(', '.join([f'--{r}' for r in required])))
+        from benchmarks.utils import run_benchmarks
         run_benchmarks(args.data_path, args.output_path)
 
 
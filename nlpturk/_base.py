@@ -1,26 +1,97 @@
+from __future__ import annotations
+
 import re
 import sys
+import json
+import time
 import itertools
+import contextlib
 import warnings
+import threading
+import collections
+import multiprocessing as mp
+from functools import partial
 from pathlib import Path
 from importlib.util import find_spec
-
-import spacy
-from spacy import util
-from spacy.tokens.doc import Doc
-from wasabi import Printer
+from typing import TYPE_CHECKING, Iterable, Iterator, Optional, Union, Tuple, List, Dict, Any
 
 from . import pkg
-from .pipeline.tokenizer import Tokenizer
-from .pipeline import sbd
-from .doc import Document
+from .utils import chunk_text
+from .batcher import MicroBatcher
+from .cache import LRUCache, DiskCache, cache_key
+from .metrics import Stats
+from ._config import settings, validators
+
+# numpy and spaCy are imported on first use to keep `import nlpturk` fast
+if TYPE_CHECKING:
+    import numpy as np
+    from spacy.tokens.doc import Doc
+    from spacy.language import Language
+    from .doc import Document
+    from .pipeline.tokenizer import Tokenizer
+
+
+class _ModelLock:
+    """Lock of the model, held shared by the threads processing texts and exclusively 
+    while the vocabulary is rotated, see `_limit_vocab`. Threads waiting for the 
+    exclusive lock go before the threads starting to process texts.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+        self._shared = 0
+        self._exclusive = False
+        self._waiting = 0
+
+    @contextlib.contextmanager
+    def shared(self) -> Iterator[None]:
+        with self._cond:
+            self._cond.wait_for(lambda: not self._exclusive and not self._waiting)
+            self._shared += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._shared -= 1
+                if not self._shared:
+                    self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def exclusive(self) -> Iterator[None]:
+        with self._cond:
+            self._waiting += 1
+            self._cond.wait_for(lambda: not self._exclusive and not self._shared)
+            self._waiting -= 1
+            self._exclusive = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._exclusive = False
+                self._cond.notify_all()
+
+
+_lock = threading.Lock()
+_model_lock = _ModelLock()
+_ws = re.compile(r'\s*')
+# sample text processed to initialize the lazily created state of a loaded model
+_warmup = ['Merhaba dünya! Bu cümle, modeli ısıtmak için işlenen örnek bir metindir. '
+           'Ayrıntılar https://nlpturk.org adresinde.']
 
 
 class _M(sys.modules[__name__].__class__):
     """Class that makes the nlpturk package a callable module.
     """
+    _cache = None
+    _disk_cache = None
+    _stats = Stats()
 
-    def __call__(self, text: str) -> Document:
+    def __call__(
+        self,
+        text: str,
+        components: Optional[Iterable[str]] = None,
+        n_process: int = 1
+    ) -> Document:
         """Makes the nlpturk package callable.
 
         Usage: 
@@ -40,84 +111,1019 @@ class _M(sys.modules[__name__].__class__):
                 for token in sent:
                     print(token.text, token.lemma, token.pos, token.vector)
 
+            # run only the sentence boundary detector
+            doc = nlpturk(some_text, components=['sbd'])
+
+        Texts longer than the `chunk_size` setting are splitted into chunks at paragraph 
+        breaks, line breaks, sentence ends or whitespaces. Chunks are processed separately, 
+        in parallel if `n_process` is greater than 1, and merged into a single document. 
+        Chunk boundaries are sentence boundaries.
+
         Args:
             text (str): Text to be processed.
+            components (Optional[Iterable[str]], optional): Pipeline components to run, 
+                e.g. `sbd`, `tagger`, `lemmatizer`. Shared embedding components are run 
+                as needed. Attributes of the skipped components are not available. 
+                Defaults to None, all pipeline components are run.
+            n_process (int, optional): Number of processes to use for long texts. Set to 
+                -1 to use all available CPUs. Defaults to 1.
 
         Returns:
             Document: Document object.
         """
-        if not hasattr(self, '_nlp'):
-            warnings.filterwarnings('ignore')
-            try:
-                model_path = Path(find_spec(pkg.__model__).origin).parent
-            except AttributeError:
-                model_path = self._download()
-            self._nlp = spacy.load(model_path)
-            self._nlp.tokenizer = Tokenizer(self._nlp)
+        from .doc import Document
 
-        return Document(self._get_doc(text))
+        self._load()
+        disable = self._disabled(components)
+        n_process = self._n_process(n_process)
+        if len(text) > settings['chunk_size']:
+            return Document(self._get_long_doc(text, disable, n_process))
+        return Document(next(self._pipe([[text]], 1, disable)))
 
-    def _get_doc(self, text: str) -> Doc:
-        """Removes whitespace tokens returned from Tokenizer and aligns character offsets
-        of the tokens. 
+    def pipe(
+        self,
+        texts: Iterable[str],
+        batch_size: Optional[int] = None,
+        n_process: int = 1,
+        components: Optional[Iterable[str]] = None
+    ) -> Iterator[Document]:
+        """Process texts as a stream. Texts are processed in batches by the model and 
+        documents are yielded in input order.
+
+        If `n_process` is greater than 1, the model is loaded once in the parent process
+        and the worker processes are forked from it, so that the model weights are shared
+        copy-on-write. Processed documents are sent back serialized. 
+
+        Usage: 
+            import nlpturk
+            for doc in nlpturk.pipe(texts, batch_size=256, n_process=4):
+                for sent in doc.sents:
+                    print(sent.text)
+
+        Args:
+            texts (Iterable[str]): Texts to be processed.
+            batch_size (Optional[int], optional): The number of texts to process at once. 
+                Defaults to the batch size of the model.
+            n_process (int, optional): Number of processes to use. Set to -1 to use all 
+                available CPUs. Defaults to 1.
+            components (Optional[Iterable[str]], optional): Pipeline components to run, 
+                see `nlpturk.__call__`. Defaults to None, all pipeline components are run.
+
+        Yields:
+            Iterator[Document]: Document objects, one for each text.
+        """
+        from spacy import util
+        from .doc import Document
+
+        self._load()
+        disable = self._disabled(components)
+        n_process = self._n_process(n_process)
+        batches = util.minibatch(texts, size=batch_size or self._nlp.batch_size)
+        for doc in self._pipe(batches, n_process, disable):
+            yield Document(doc)
+
+    async def aprocess(self, text: str, components: Optional[Iterable[str]] = None) -> Document:
+        """Process text asynchronously without blocking the event loop. Texts submitted 
+        concurrently are grouped into micro-batches and processed together in a background 
+        thread. Micro-batches are bounded by the `max_batch_size` and `max_wait` settings, 
+        see `nlpturk.configure`. Identical texts submitted while one of them is in flight 
+        are processed once, with the same pipeline components, and resolve to the same 
+        Document object.
+
+        Usage: 
+            import nlpturk
+            doc = await nlpturk.aprocess(some_text)
 
         Args:
             text (str): Text to be processed.
+            components (Optional[Iterable[str]], optional): Pipeline components to run, 
+                see `nlpturk.__call__`. Defaults to None, all pipeline components are run.
 
         Returns:
-            Doc: spaCy Doc object.
+            Document: Document object.
+        """
+        # already imported by the event loop
+        import asyncio
+
+        if not hasattr(self, '_batcher'):
+            with _lock:
+                if not hasattr(self, '_batcher'):
+                    self._batcher = MicroBatcher(
+                        self._process_items,
+                        max_batch_size=settings['max_batch_size'],
+                        max_wait=settings['max_wait'],
+                        coalesce=True
+                    )
+        if components is not None:
+            components = [components] if isinstance(components, str) else list(components)
+            # invalid components fail only this call, not the micro-batch
+            self._load()
+            self._disabled(components)
+            components = tuple(sorted(components))
+        return await asyncio.wrap_future(self._batcher.submit((text, components)))
+
+    def embed(
+        self,
+        texts: Iterable[str],
+        out: Union[str, Path],
+        level: str = 'sent',
+        dtype: str = 'float32',
+        batch_size: Optional[int] = None,
+        n_process: int = 1
+    ) -> Tuple[np.memmap, np.memmap]:
+        """Embed texts as a stream and write sentence or document vectors to a file. Vectors 
+        are written as the documents are processed, memory usage does not depend on the 
+        number of texts.
+
+        Vectors are saved to `out` as a raw matrix. The index of the vectors is saved to 
+        `{out}.index` as a raw int64 matrix of 3 columns, i.e. the position of the text in 
+        input, start and end character offsets of the sentence or document within the 
+        text. Shapes and data types of the matrices are saved to `{out}.json`. Texts without 
+        tokens have no vectors.
+
+        Usage: 
+            import nlpturk
+            vectors, index = nlpturk.embed(texts, 'path/to/vectors', level='sent')
+            text_id, start, end = index[0]
+
+        Args:
+            texts (Iterable[str]): Texts to be embedded.
+            out (Union[str, Path]): Path to the vectors file. Will be overwritten if it exists.
+            level (str, optional): Either `sent` to embed sentences or `doc` to embed 
+                texts. Defaults to 'sent'.
+            dtype (str, optional): Data type of the vectors, either `float32` or `float16`. 
+                Defaults to 'float32'.
+            batch_size (Optional[int], optional): The number of texts to process at once. 
+                Defaults to the batch size of the model.
+            n_process (int, optional): Number of processes to use, see `nlpturk.pipe`. 
+                Defaults to 1.
+
+        Returns:
+            Tuple[np.memmap, np.memmap]: Read-only memory-mapped vectors and index.
+        """
+        import numpy as np
+        from spacy import util
+
+        if level not in ('sent', 'doc'):
+            raise ValueError('"level" must be either "sent" or "doc".')
+        if dtype not in ('float32', 'float16'):
+            raise ValueError('"dtype" must be either "float32" or "float16".')
+        self._load()
+        # only embedding components are run, and sentence boundary detection if needed
+        disable = self._disabled(['sbd']) + (['sbd'] if level == 'doc' else [])
+        n_process = self._n_process(n_process)
+        batches = util.minibatch(texts, size=batch_size or self._nlp.batch_size)
+
+        out, rows, width = Path(out), 0, 0
+        with open(out, 'wb') as f, open(f'{out}.index', 'wb') as f_index:
+            for i, doc in enumerate(self._pipe(batches, n_process, disable)):
+                if not len(doc):
+                    continue
+                vectors, spans = self._embed_rows(doc, level)
+                f.write(vectors.astype(dtype).tobytes())
+                index = np.column_stack([np.full(len(spans), i), spans]).astype(np.int64)
+                f_index.write(index.tobytes())
+                rows, width = rows + len(vectors), vectors.shape[1]
+        with open(f'{out}.json', 'w', encoding='utf-8') as f:
+            json.dump({'level': level, 'vectors': {'dtype': dtype, 'shape': [rows, width]},
+                       'index': {'dtype': 'int64', 'shape': [rows, 3]}}, f)
+
+        # empty files can not be memory-mapped
+        if not rows:
+            return np.empty((0, width), dtype=dtype), np.empty((0, 3), dtype=np.int64)
+        return (np.memmap(out, dtype=dtype, mode='r', shape=(rows, width)),
+                np.memmap(f'{out}.index', dtype=np.int64, mode='r', shape=(rows, 3)))
+
+    def tokenize(self, text: str) -> Document:
+        """Tokenize text without loading the model. Only the token texts, character 
+        offsets and lexical attributes are available, see `nlpturk.__call__`.
+
+        Usage: 
+            import nlpturk
+            doc = nlpturk.tokenize(some_text)
+            for token in doc:
+                print(token.text, token.idx)
+
+        Args:
+            text (str): Text to be tokenized.
+
+        Returns:
+            Document: Document object.
+        """
+        return next(self.tokenize_batch([text]))
+
+    def tokenize_batch(self, texts: Iterable[str]) -> Iterator[Document]:
+        """Tokenize texts without loading the model, see `nlpturk.tokenize`.
+
+        Args:
+            texts (Iterable[str]): Texts to be tokenized.
+
+        Yields:
+            Iterator[Document]: Document objects, one for each text.
         """
-        # grab trailing whitespaces for each word
-        idx, ws = [0], []
-        for m in re.finditer(r'\s+', text):
-            if m.start(0) > 0:
-                idx.append(m.end(0))
-                ws.append(m.group(0))
+        from .doc import Document
 
-        # grab leading whitespaces from text
-        lws = ''.join(itertools.takewhile(str.isspace, text))
-        idx[0] = len(lws) if lws else 0
+        for text in texts:
+            doc = self._get_tokenizer()(' '.join(text.split()))
+            doc._.components = []
+            yield Document(self._align(doc, text))
+
+    def preload(self, warmup: Optional[Iterable[str]] = None) -> None:
+        """Load and warm up the model before forking worker processes, e.g. in the master
+        process of a pre-fork server. Objects allocated so far are moved to the permanent
+        generation of the garbage collector, so that collections in the workers do not
+        write to the pages of the model and the pages stay shared by the workers.
+
+        Usage:
+            # gunicorn.conf.py, with `preload_app = True`
+            import nlpturk
+            nlpturk.preload()
+
+        Args:
+            warmup (Optional[Iterable[str]], optional): Texts to run through the pipeline,
+                so that the lazily initialized state is created before forking.
+                Defaults to None, a short sample text is used.
+        """
+        import gc
+
+        self._load()
+        for doc in self.pipe(_warmup if warmup is None else warmup):
+            doc.vector
+        gc.collect()
+        gc.freeze()
+
+    def reload(
+        self,
+        model_path: Optional[Union[str, Path]] = None,
+        warmup: Optional[Iterable[str]] = None
+    ) -> None:
+        """Replace the model without interrupting the processing. The new model is loaded 
+        and warmed up while the current model keeps processing texts, then it is swapped 
+        in at once. Texts in flight are processed by the model they started with, the 
+        memory of the old model is released when they are done. Cached documents are 
+        discarded. 
+
+        Usage: 
+            import threading
+            import nlpturk
+            # load the retrained model in the background
+            threading.Thread(target=nlpturk.reload, args=('path/to/model',)).start()
+
+        Args:
+            model_path (Optional[Union[str, Path]], optional): Path to the model directory, 
+                updates the `model_path` setting. Defaults to None, the model of the 
+                `model_path` setting or the installed nlpTurk model is reloaded.
+            warmup (Optional[Iterable[str]], optional): Texts to run through the new model 
+                before it is swapped in. Defaults to None, a short sample text is used.
+        """
+        import gc
+
+        if model_path is not None:
+            self.configure(model_path=model_path)
+        from . import model
+
+        model_path = self._model_path()
+        nlp = self._load_model(model_path)
+        strings = list(nlp.vocab.strings)
+        for _ in self._process(_warmup if warmup is None else warmup, nlp=nlp):
+            pass
+        fingerprint = model.fingerprint(model_path)
+        disk_cache = None if settings['disk_cache'] is None else \
+            DiskCache(settings['disk_cache'], self._cache_version(fingerprint))
+        with _lock:
+            old = getattr(self, '_nlp', None)
+            self._strings = strings
+            self._fingerprint = fingerprint
+            self._nlp = nlp
+            # documents of the old model are not valid for the new model
+            if self._cache is not None:
+                self._cache = LRUCache(settings['cache_size'])
+            self._disk_cache = disk_cache
+        del old
+        # objects of the old model may be frozen by `nlpturk.preload`
+        frozen = gc.get_freeze_count() > 0
+        if frozen:
+            gc.unfreeze()
+        gc.collect()
+        if frozen:
+            gc.freeze()
+
+    def configure(self, **kwargs: Any) -> None:
+        """Update nlpTurk settings.
+
+        Usage: 
+            import nlpturk
+            nlpturk.configure(max_batch_size=64, max_wait=0.01)
+
+        Args:
+            max_batch_size (int, optional): Maximum number of texts in a micro-batch of 
+                `nlpturk.aprocess`. Defaults to 32.
+            max_wait (float, optional): Maximum time in seconds to wait for a micro-batch 
+                of `nlpturk.aprocess` to fill up. Defaults to 0.005.
+            chunk_size (int, optional): Texts longer than `chunk_size` characters are 
+                processed in chunks. Should not exceed the maximum text length of the 
+                model. Defaults to 100000.
+            cache_size (int, optional): Memory budget in bytes of the in-memory cache 
+                of processed documents. Documents are cached in serialized form and 
+                the least recently used ones are evicted first. Set to 0 to disable 
+                the cache. Defaults to 0.
+            disk_cache (Optional[Union[str, Path]], optional): Path to the SQLite 
+                database of the persistent cache of processed documents. Cached entries 
+                are invalidated when the model changes. Set to None to disable the cache. 
+                Defaults to None.
+            vector_dtype (str, optional): Data type of the token vectors stored on the 
+                documents and the vectors returned, either `float32` or `float16`. 
+                Half precision halves the memory usage of the vectors, they can be 
+                converted with `vector.astype('float32')` when needed. Applies to the 
+                documents processed afterwards. Defaults to 'float32'.
+            model_path (Optional[Union[str, Path]], optional): Path to the model directory, 
+                e.g. a model exported by `python -m nlpturk export_fast`. Models in the 
+                fast-load format are loaded with memory-mapped weights. Applies to the 
+                model loaded afterwards. Defaults to None, the installed nlpTurk model 
+                is used.
+            stats (bool, optional): Whether to record processing statistics of each 
+                stage, see `nlpturk.stats`. Defaults to False.
+            max_vocab_size (int, optional): Maximum number of strings added to the 
+                vocabulary by the processed texts, e.g. new words, urls, hashtags. The 
+                vocabulary is reset to the strings of the model when it is exceeded, 
+                so that the memory usage of long-running processes is bounded. Set to 0 
+                to disable the limit. Defaults to 0.
+        """
+        unknown = [k for k in kwargs if k not in settings]
+        if unknown:
+            raise ValueError(f'Unknown setting(s): {", ".join(unknown)}.')
+        for k, v in kwargs.items():
+            valid, description = validators[k]
+            if not valid(v):
+                raise ValueError(f'"{k}" must be {description}.')
+        settings.update(kwargs)
+
+        if hasattr(self, '_batcher'):
+            self._batcher.max_batch_size = settings['max_batch_size']
+            self._batcher.max_wait = settings['max_wait']
+        if 'cache_size' in kwargs:
+            self._cache = LRUCache(settings['cache_size']) if settings['cache_size'] else None
+        if 'disk_cache' in kwargs:
+            # opened with the model version on first use
+            self._disk_cache = None
+
+    def cache_info(self) -> Dict[str, Dict[str, Any]]:
+        """Returns statistics of the caches, see `nlpturk.configure`.
+
+        Usage: 
+            import nlpturk
+            nlpturk.configure(cache_size=256 * 1024**2, disk_cache='path/to/cache.db')
+            ...
+            print(nlpturk.cache_info())
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics of the enabled caches by cache type, 
+                i.e. `inflight`, `memory` and `disk`. Number of `nlpturk.aprocess` calls 
+                coalesced with an identical text in flight. Number of cache hits and 
+                misses, number of cached entries, size of the cached entries and memory 
+                budget in bytes for the in-memory cache, database path and model version 
+                for the persistent cache.
+        """
+        info = {}
+        if hasattr(self, '_batcher'):
+            info['inflight'] = {'coalesced': self._batcher.coalesced}
+        if self._cache is not None:
+            info['memory'] = self._cache.info()
+        if settings['disk_cache'] is not None and hasattr(self, '_nlp'):
+            info['disk'] = self._get_disk_cache().info()
+        return info
+
+    def stats(self, reset: bool = False) -> Dict[str, Dict[str, Any]]:
+        """Returns processing statistics of each stage, i.e. `tokenizer`, pipeline 
+        components and `align`. Statistics are recorded if `stats` setting is enabled, 
+        except for the stages run in the worker processes.
+
+        Usage: 
+            import nlpturk
+            nlpturk.configure(stats=True)
+            docs = list(nlpturk.pipe(texts))
+            for stage, s in nlpturk.stats().items():
+                print(stage, s['calls'], s['tokens_per_sec'], s['p95'])
+
+        Args:
+            reset (bool, optional): Whether to reset the statistics. Defaults to False.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics by stage, i.e. number of calls and 
+                tokens, total time in seconds, throughput in tokens per second, and p50, 
+                p95, p99 and maximum durations of a batch in seconds.
+        """
+        summary = self._stats.summary()
+        if reset:
+            self._stats.reset()
+        return summary
+
+    def _process_items(self, items: List[Tuple[str, Optional[Tuple[str, ...]]]]) -> List[Document]:
+        """Process a micro-batch of texts. Texts are grouped by the pipeline components 
+        to run.
+
+        Args:
+            items (List[Tuple[str, Optional[Tuple[str, ...]]]]): Texts and pipeline 
+                components to run.
+
+        Returns:
+            List[Document]: Document objects, in the order of the items. The exception 
+                raised while processing a group of texts is returned for each text of 
+                the group, the other groups are not affected.
+        """
+        groups = {}
+        for i, (_, components) in enumerate(items):
+            groups.setdefault(components, []).append(i)
+        docs = [None] * len(items)
+        for components, ids in groups.items():
+            texts = [items[i][0] for i in ids]
+            try:
+                for i, doc in zip(ids, self.pipe(texts, batch_size=len(texts),
+                                                 components=components)):
+                    docs[i] = doc
+            except Exception as e:
+                for i in ids:
+                    docs[i] = e
+        return docs
+
+    def _pipe(
+        self,
+        batches: Iterable[List[str]],
+        n_process: int,
+        disable: List[str]
+    ) -> Iterator[Doc]:
+        """Processes batches of texts, see `_process`. Documents of the cached texts are 
+        restored from the caches, only the remaining texts are processed by the model. 
+
+        Args:
+            batches (Iterable[List[str]]): Batches of texts to be processed.
+            n_process (int): Number of processes to use.
+            disable (List[str]): Pipeline components to be disabled.
+
+        Yields:
+            Iterator[Doc]: spaCy Doc objects, in input order.
+        """
+        from spacy.tokens.doc import Doc
+
+        # texts in flight are processed by the same model if it is reloaded
+        nlp = self._nlp
+        caches = [c for c in (self._cache, self._get_disk_cache()) if c is not None]
+        components = self._components(disable, nlp)
+        pending = collections.deque()
+
+        def misses():
+            for batch in batches:
+                keys = [cache_key(text, components) for text in batch] if caches else []
+                cached = [None] * len(batch)
+                # look up the faster caches first
+                for cache in caches:
+                    ids = [i for i, data in enumerate(cached) if data is None]
+                    if not ids:
+                        break
+                    for i, data in zip(ids, cache.get_many(keys[i] for i in ids)):
+                        cached[i] = data
+                pending.append((keys, cached))
+                yield [text for text, data in zip(batch, cached) if data is None]
+
+        if n_process > 1:
+            results = self._multiprocessing_pipe(misses(), n_process, disable)
+        else:
+            results = (self._run_batch(batch, disable, nlp) if batch else []
+                       for batch in misses())
+        for docs in results:
+            keys, cached = pending.popleft()
+            if caches:
+                processed = iter(docs)
+                docs = [Doc(nlp.vocab).from_bytes(data) if data is not None
+                        else next(processed) for data in cached]
+                items = [(key, doc.to_bytes()) for key, doc, data in zip(keys, docs, cached)
+                         if data is None]
+                # documents of a replaced model are not cached
+                if nlp is self._nlp:
+                    for cache in caches:
+                        cache.set_many(items)
+            self._limit_vocab(nlp)
+            # documents are cached with the original vectors
+            for doc in docs:
+                yield self._cast_vectors(doc)
+
+    def _run_batch(self, texts: List[str], disable: List[str], nlp: Language) -> List[Doc]:
+        """Processes a batch of texts, see `_process`. The vocabulary of the model is not 
+        rotated while the batch is processed, see `_limit_vocab`.
+
+        Args:
+            texts (List[str]): Texts to be processed.
+            disable (List[str]): Pipeline components to be disabled.
+            nlp (Language): Model to process the texts.
+
+        Returns:
+            List[Doc]: spaCy Doc objects.
+        """
+        with _model_lock.shared():
+            return list(self._process(texts, len(texts), disable, nlp))
 
-        doc = self._nlp(' '.join(text.split()))
+    def _get_tokenizer(self) -> Tokenizer:
+        """Returns the tokenizer of `nlpturk.tokenize`, creates it on first use. The 
+        tokenizer is replaced with a new one, along with the vocabulary of its blank model, 
+        if the strings added by the tokenized texts exceed the `max_vocab_size` setting, 
+        see `_limit_vocab`.
 
-        # set aligned offsets and trailing whitespaces for each token
-        tokens, i = [], idx[0]
+        Returns:
+            Tokenizer: nlpTurk tokenizer.
+        """
+        tokenizer, limit = getattr(self, '_tokenizer', None), settings['max_vocab_size']
+        if tokenizer is not None and (
+                not limit or len(tokenizer.vocab.strings) - self._tokenizer_strings <= limit):
+            return tokenizer
+        with _lock:
+            tokenizer = getattr(self, '_tokenizer', None)
+            if tokenizer is None or (
+                    limit and len(tokenizer.vocab.strings) - self._tokenizer_strings > limit):
+                import spacy
+                from .pipeline.tokenizer import Tokenizer
+
+                tokenizer = Tokenizer(spacy.blank('tr'))
+                # strings of the blank model are not counted towards the limit
+                self._tokenizer_strings = len(tokenizer.vocab.strings)
+                self._tokenizer = tokenizer
+            return tokenizer
+
+    def _limit_vocab(self, nlp: Language) -> None:
+        """Rotates the vocabulary of the model if the strings added by the processed texts 
+        exceed the `max_vocab_size` setting, see `rotate_vocab`.
+
+        Args:
+            nlp (Language): spaCy Language object.
+        """
+        limit = settings['max_vocab_size']
+        if not limit or len(nlp.vocab.strings) - len(self._strings) <= limit:
+            return
+        from .vocab import rotate_vocab
+
+        # waits for the batches in progress, see `_run_batch`
+        with _model_lock.exclusive():
+            # a replaced model is released instead
+            if nlp is self._nlp and len(nlp.vocab.strings) - len(self._strings) > limit:
+                rotate_vocab(nlp, self._strings)
+
+    def _get_disk_cache(self) -> Optional[DiskCache]:
+        """Returns the persistent cache, opens it on first use.
+
+        Returns:
+            Optional[DiskCache]: Persistent cache, None if disabled.
+        """
+        if settings['disk_cache'] is None:
+            return None
+        if self._disk_cache is None:
+            with _lock:
+                if self._disk_cache is None:
+                    self._disk_cache = DiskCache(settings['disk_cache'],
+                                                 self._cache_version(self._fingerprint))
+        return self._disk_cache
+
+    @staticmethod
+    def _cache_version(fingerprint: str) -> str:
+        """
+        Args:
+            fingerprint (str): Fingerprint of the model, see `model.fingerprint`.
+
+        Returns:
+            str: Version of the cached documents, bound to the nlpTurk version and the 
+                model files.
+        """
+        return f'{pkg.__version__}/{fingerprint}'
+
+    def _multiprocessing_pipe(
+        self,
+        batches: Iterable[List[str]],
+        n_process: int,
+        disable: List[str],
+        pool_trf: bool = False
+    ) -> Iterator[List[Doc]]:
+        """Processes batches of texts in forked worker processes. 
+
+        Args:
+            batches (Iterable[List[str]]): Batches of texts to be processed.
+            n_process (int): Number of processes to use.
+            disable (List[str]): Pipeline components to be disabled.
+            pool_trf (bool, optional): Whether to pool the transformer outputs in the 
+                workers, see `_pool_trf`. Defaults to False.
+
+        Yields:
+            Iterator[List[Doc]]: spaCy Doc objects deserialized from the worker outputs, 
+                one list for each batch.
+        """
+        from spacy.tokens.doc import Doc
+
+        if 'fork' not in mp.get_all_start_methods():
+            raise ValueError('Multiprocessing requires the `fork` start method, '
+                             'which is not supported on this platform.')
+
+        # workers are forked with the current model
+        vocab = self._nlp.vocab
+        # the pool consumes batches eagerly, limit the number of batches sent ahead
+        slots, done = threading.BoundedSemaphore(2 * n_process), threading.Event()
+
+        def throttled():
+            for batch in batches:
+                while not slots.acquire(timeout=0.1):
+                    if done.is_set():
+                        return
+                yield batch
+
+        with mp.get_context('fork').Pool(n_process) as pool:
+            try:
+                for batch in pool.imap(partial(_process_batch, disable=disable,
+                                                    pool_trf=pool_trf), throttled()):
+                    slots.release()
+                    yield [Doc(vocab).from_bytes(data) for data in batch]
+            finally:
+                done.set()
+
+    def _load(self) -> None:
+        """Loads nlpTurk model, if not already loaded.
+        """
+        if hasattr(self, '_nlp'):
+            return
+        with _lock:
+            if hasattr(self, '_nlp'):
+                return
+            from . import model
+
+            model_path = self._model_path()
+            nlp = self._load_model(model_path)
+            self._strings = list(nlp.vocab.strings)
+            self._fingerprint = model.fingerprint(model_path)
+            # publish the model only when it is ready to use
+            self._nlp = nlp
+
+    @staticmethod
+    def _load_model(model_path: Path) -> Language:
+        """
+        Args:
+            model_path (Path): Path to the model directory.
+
+        Returns:
+            Language: spaCy Language object with nlpTurk tokenizer.
+        """
+        warnings.filterwarnings('ignore')
+        import spacy
+        from .pipeline.tokenizer import Tokenizer
+        # registers the `sbd` component factory and the document extensions
+        from .pipeline import sbd
+        from . import doc
+        from . import model
+
+        nlp = model.load_fast(model_path) if model.is_fast(model_path) \
+            else spacy.load(model_path)
+        nlp.tokenizer = Tokenizer(nlp)
+        return nlp
+
+    def _model_path(self) -> Path:
+        """Returns the path of the model set by `model_path` setting, or the path of the 
+        installed nlpTurk model. The model is fetched into the local model store if it 
+        is not installed.
+
+        Returns:
+            Path: Model path.
+        """
+        if settings['model_path'] is not None:
+            return Path(settings['model_path'])
+        try:
+            return Path(find_spec(pkg.__model__).origin).parent
+        except AttributeError:
+            return self._download()
+
+    def _n_process(self, n_process: int) -> int:
+        """Validates the number of processes.
+
+        Args:
+            n_process (int): Number of processes, -1 for all available CPUs.
+
+        Returns:
+            int: Number of processes.
+        """
+        if n_process == -1:
+            return mp.cpu_count()
+        if not isinstance(n_process, int) or n_process < 1:
+            raise ValueError('"n_process" must be a positive integer or -1.')
+        return n_process
+
+    def _disabled(self, components: Optional[Iterable[str]]) -> List[str]:
+        """Returns the pipeline components to be disabled to run only the given components. 
+        Shared embedding components are disabled only if no other component is run.
+
+        Args:
+            components (Optional[Iterable[str]]): Pipeline components to run.
+
+        Returns:
+            List[str]: Pipeline components to be disabled.
+        """
+        if components is None:
+            return []
+        components = [components] if isinstance(components, str) else list(components)
+        shared = ('tok2vec', 'transformer')
+        names = [n for n in self._nlp.pipe_names if n not in shared]
+        unknown = [c for c in components if c not in names]
+        if unknown:
+            raise ValueError(f'Unknown component(s): {", ".join(unknown)}. '
+                             f'Available components: {", ".join(names)}.')
+        disable = [n for n in names if n not in components]
+        if not components:
+            disable.extend(n for n in self._nlp.pipe_names if n in shared)
+        return disable
+
+    def _components(self, disable: List[str], nlp: Optional[Language] = None) -> List[str]:
+        """
+        Args:
+            disable (List[str]): Pipeline components to be disabled.
+            nlp (Optional[Language], optional): Model of the pipeline components. 
+                Defaults to None, the current model.
+
+        Returns:
+            List[str]: Pipeline components to be run.
+        """
+        nlp = nlp if nlp is not None else self._nlp
+        return [n for n in nlp.pipe_names if n not in disable]
+
+    def _process(
+        self,
+        texts: Iterable[str],
+        batch_size: Optional[int] = None,
+        disable: List[str] = [],
+        nlp: Optional[Language] = None
+    ) -> Iterator[Doc]:
+        """Processes texts in batches by removing whitespace tokens returned from Tokenizer 
+        and aligns character offsets of the tokens with the original texts. 
+
+        Args:
+            texts (Iterable[str]): Texts to be processed.
+            batch_size (Optional[int], optional): The number of texts to process at once. 
+                Defaults to the batch size of the model.
+            disable (List[str], optional): Pipeline components to be disabled. 
+                Defaults to [].
+            nlp (Optional[Language], optional): Model to process the texts. Defaults to 
+                None, the current model.
+
+        Yields:
+            Iterator[Doc]: spaCy Doc objects.
+        """
+        nlp = nlp if nlp is not None else self._nlp
+        if settings['stats']:
+            yield from self._process_timed(texts, batch_size, disable, nlp)
+            return
+        components = self._components(disable, nlp)
+        texts = ((' '.join(text.split()), text) for text in texts)
+        for doc, text in nlp.pipe(texts, as_tuples=True, batch_size=batch_size,
+                                  disable=disable):
+            doc._.components = components
+            yield self._align(doc, text)
+
+    def _process_timed(
+        self,
+        texts: Iterable[str],
+        batch_size: Optional[int] = None,
+        disable: List[str] = [],
+        nlp: Optional[Language] = None
+    ) -> Iterator[Doc]:
+        """Processes texts as `_process`, one stage at a time for each batch, and records 
+        the duration of each stage, see `nlpturk.stats`.
+
+        Args:
+            texts (Iterable[str]): Texts to be processed.
+            batch_size (Optional[int], optional): The number of texts to process at once. 
+                Defaults to the batch size of the model.
+            disable (List[str], optional): Pipeline components to be disabled. 
+                Defaults to [].
+            nlp (Optional[Language], optional): Model to process the texts. Defaults to 
+                None, the current model.
+
+        Yields:
+            Iterator[Doc]: spaCy Doc objects.
+        """
+        from spacy import util
+
+        nlp = nlp if nlp is not None else self._nlp
+        components = self._components(disable, nlp)
+        for batch in util.minibatch(texts, size=batch_size or nlp.batch_size):
+            start = time.perf_counter()
+            docs = [nlp.make_doc(' '.join(text.split())) for text in batch]
+            tokens = sum(len(doc) for doc in docs)
+            self._stats.record('tokenizer', time.perf_counter() - start, tokens)
+            for name, proc in nlp.pipeline:
+                if name in disable:
+                    continue
+                start = time.perf_counter()
+                docs = list(proc.pipe(docs, batch_size=len(docs))) if hasattr(proc, 'pipe') \
+                    else [proc(doc) for doc in docs]
+                self._stats.record(name, time.perf_counter() - start, tokens)
+            start = time.perf_counter()
+            for doc, text in zip(docs, batch):
+                doc._.components = components
+                self._align(doc, text)
+            self._stats.record('align', time.perf_counter() - start, tokens)
+            yield from docs
+
+    @staticmethod
+    def _align(doc: Doc, text: str) -> Doc:
+        """Aligns character offsets and trailing whitespaces of the tokens processed 
+        from whitespace normalized text with the original text.
+
+        Args:
+            doc (Doc): spaCy Doc object of the whitespace normalized text.
+            text (str): Original text.
+
+        Returns:
+            Doc: spaCy Doc object.
+        """
+        import numpy as np
+
+        # the tokens of the normalized text are separated by a single space at most, 
+        # walk the original text once and skip whitespaces where the tokens are separated
+        idx, ws, last = [], [], len(doc) - 1
+        i = _ws.match(text).end()
         for t in doc:
-            if t.whitespace_:
-                tokens.append((i, ws[0]))
-                idx.pop(0)
-                ws.pop(0)
-                i = idx[0]
+            idx.append(i)
+            i += len(t.text)
+            if t.whitespace_ or t.i == last:
+                j = _ws.match(text, i).end()
+                ws.append(j - i)
+                i = j
             else:
-                tokens.append((i, ''))
-                i += len(t.text)
+                ws.append(0)
+
+        # offsets are stored per document, as the extension defaults are shared by all docs
+        doc._.text = text
+        doc._.idx = np.array(idx, dtype=np.int32)
+        doc._.ws = np.array(ws, dtype=np.int32)
 
-        # add trailing whitespaces to last token, if exist
-        tokens[-1] = (tokens[-1][0], ws[0]) if ws else tokens[-1]
+        return doc
 
-        doc.set_extension('idx', default=[t[0] for t in tokens], force=True)
-        doc.set_extension('ws', default=[t[1] for t in tokens], force=True)
-        doc.set_extension('lws', default=lws, force=True)
+    @staticmethod
+    def _cast_vectors(doc: Doc) -> Doc:
+        """Casts the token vectors stored on the document, i.e. outputs of tok2vec or 
+        transformer components, to the `vector_dtype` setting.
 
+        Args:
+            doc (Doc): spaCy Doc object.
+
+        Returns:
+            Doc: spaCy Doc object.
+        """
+        from spacy.tokens.doc import Doc
+
+        dtype = settings['vector_dtype']
+        if doc.tensor is not None and doc.tensor.size and doc.tensor.dtype != dtype:
+            doc.tensor = doc.tensor.astype(dtype)
+        trf_data = doc._.trf_data if Doc.has_extension('trf_data') else None
+        if trf_data is not None and any(t.dtype != dtype for t in trf_data.tensors):
+            trf_data.tensors = [t.astype(dtype) for t in trf_data.tensors]
         return doc
 
-    def _download(self) -> Path:
-        """Downloads nlpTurk model.
+    @staticmethod
+    def _pool_trf(doc: Doc) -> Doc:
+        """Stores the transformer outputs pooled into token vectors as the tensor of the 
+        document, see `nlpturk.doc._pool`. Chunks of long texts are pooled before they are 
+        merged, as `Doc.from_docs` does not carry over the transformer outputs.
+
+        Args:
+            doc (Doc): spaCy Doc object.
+
+        Returns:
+            Doc: spaCy Doc object.
+        """
+        from spacy.tokens.doc import Doc
+        from .doc import _pool
+
+        if doc.vocab.vectors.size or (doc.tensor is not None and doc.tensor.size):
+            return doc
+        if Doc.has_extension('trf_data') and doc._.trf_data is not None:
+            doc.tensor = _pool(doc)
+        return doc
+
+    @staticmethod
+    def _embed_rows(doc: Doc, level: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Pools token vectors into sentence or document vectors, see `nlpturk.embed`.
+
+        Args:
+            doc (Doc): spaCy Doc object with at least one token.
+            level (str): Either `sent` or `doc`.
+
+        Returns:
+            Tuple[np.ndarray, np.ndarray]: Vectors, and start and end character offsets 
+                of the sentences or the document.
+        """
+        import numpy as np
+        from .doc import Document
+
+        document = Document(doc)
+        vectors = document._get_vectors()
+        if level == 'sent':
+            starts = np.flatnonzero(document.to_arrays(['is_sent_start'])['is_sent_start'])
+        else:
+            starts = np.zeros(1, dtype=np.int64)
+        ends = np.append(starts[1:], len(doc))
+        vectors = np.add.reduceat(vectors, starts, axis=0, dtype='float32') / \
+            (ends - starts)[:, None]
+        lengths = doc.to_array('LENGTH').astype(np.int64)
+        spans = np.column_stack([doc._.idx[starts], doc._.idx[ends - 1] + lengths[ends - 1]])
+        return vectors, spans
+
+    def _get_long_doc(self, text: str, disable: List[str], n_process: int) -> Doc:
+        """Processes long text in chunks and merges them into a single document, 
+        see `_process`.
 
         Args:
-            model (str): nlpTurk model name.
+            text (str): Text to be processed.
+            disable (List[str]): Pipeline components to be disabled.
+            n_process (int): Number of processes to use.
+
+        Returns:
+            Doc: spaCy Doc object.
+        """
+        from spacy.tokens.doc import Doc
+        from thinc.api import get_array_module
+
+        # chunks are processed by the same model if it is reloaded
+        nlp = self._nlp
+        # chunks are processed one at a time, so that the memory used by the model 
+        # is bounded by the chunk size
+        chunks = (text[start:end] for start, end in chunk_text(text, settings['chunk_size']))
+        if n_process > 1:
+            docs = itertools.chain.from_iterable(
+                self._multiprocessing_pipe(([c] for c in chunks), n_process, disable, True))
+        else:
+            with _model_lock.shared():
+                docs = [self._pool_trf(doc) for doc in self._process(chunks, 1, disable, nlp)]
+        docs = [doc for doc in docs if len(doc)]
+        if not docs:
+            return self._run_batch([text], disable, nlp)[0]
+
+        lengths = [len(d) for d in docs]
+        tensors = [d.tensor for d in docs]
+        doc = Doc.from_docs(docs, ensure_whitespace=True)
+        del docs
+        if all(t is not None and t.size for t in tensors):
+            # token vectors of the chunks, document extensions are not merged
+            xp = get_array_module(tensors[0])
+            doc.tensor = xp.concatenate(tensors)
+        del tensors
+        if 'sbd' not in disable:
+            # chunk boundaries are sentence boundaries
+            for i in itertools.accumulate(lengths[:-1]):
+                doc[i - 1]._.sent_end = True
+                doc[i].is_sent_start = True
+        doc._.components = self._components(disable, nlp)
+        return self._cast_vectors(self._align(doc, text))
+
+    def _download(self) -> Path:
+        """Fetches nlpTurk model into the local model store, see `ModelStore`.
 
         Returns:
             Path: Model path.
         """
+        import os
+        from wasabi import Printer
+        from .store import ModelStore
+
+        store = ModelStore()
+        sha256 = pkg.__model_sha256__ or os.environ.get('NLPTURK_MODEL_SHA256')
+        if store.has(pkg.__download_url__):
+            return store.get(pkg.__download_url__, sha256)
         msg = Printer()
+        if not sha256:
+            msg.fail('nlpTurk model not found, and no checksum is pinned to verify it.')
+            msg.fail('Please install the model, or set `NLPTURK_MODEL_SHA256` environment '
+                     'variable to the SHA-256 checksum of the released model archive.')
+            raise ValueError('No SHA-256 checksum of the model archive is available.')
         msg.info(f'nlpTurk model not found! Downloading ...')
-        cmd = [sys.executable, "-m", "pip", "install"] + [pkg.__download_url__]
         try:
-            util.run_command(cmd)
-            model_path = Path(find_spec(pkg.__model__).origin).parent
-            return model_path
-        except:
+            return store.get(pkg.__download_url__, sha256)
+        except ValueError:
             msg.fail('Connection to server is failed.')
-            msg.fail('Please try again later and make sure your Internet connection is on.')
+            msg.fail('Please try again later and make sure your Internet connection is on, '
+                     'or set `NLPTURK_MIRRORS` environment variable to the local mirrors.')
             raise
+
+
+def _process_batch(texts: List[str], disable: List[str], pool_trf: bool = False) -> List[bytes]:
+    """Process a batch of texts in a worker process. The model is inherited from the 
+    parent process on fork.
+
+    Args:
+        texts (List[str]): Texts to be processed.
+        disable (List[str]): Pipeline components to be disabled.
+        pool_trf (bool, optional): Whether to pool the transformer outputs into the 
+            tensors of the documents. Defaults to False.
+
+    Returns:
+        List[bytes]: Serialized spaCy Doc objects.
+    """
+    if not texts:
+        return []
+    m = sys.modules[__package__]
+    # token extensions of the `sbd` component are serialized with the user data
+    docs = m._process(texts, len(texts), disable)
+    if pool_trf:
+        docs = map(m._pool_trf, docs)
+    return [doc.to_bytes() for doc in docs]
@@ -0,0 +1,62 @@
+import os
+
+
+# Runtime settings, updated via `nlpturk.configure`
+settings = {
+    # maximum number of texts in a micro-batch of `nlpturk.aprocess`
+    'max_batch_size': 32,
+    # maximum time in seconds to wait for a micro-batch of `nlpturk.aprocess` to fill up
+    'max_wait': 0.005,
+    # texts longer than `chunk_size` characters are processed in chunks
+    'chunk_size': 100000,
+    # memory budget in bytes of the in-memory cache of processed documents, 0 disables it
+    'cache_size': 0,
+    # path to the SQLite database of the persistent cache of processed documents
+    'disk_cache': None,
+    # data type of the token vectors stored on the documents
+    'vector_dtype': 'float32',
+    # path to the model directory, the installed nlpTurk model is used if not set
+    'model_path': None,
+    # whether to record processing statistics of each stage
+    'stats': False,
+    # maximum number of strings added to the vocabulary by processed texts, 0 disables it
+    'max_vocab_size': 0,
+}
+
+
+def _positive_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+
+def _non_negative_int(value):
+    return isinstance(value, int) and not isinstance(value, bool) and value >= 0
+
+
+def _non_negative_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+
+
+def _optional_path(value):
+    return value is None or isinstance(value, (str, os.PathLike))
+
+
+def _bool(value):
+    return isinstance(value, bool)
+
+
+def _vector_dtype(value):
+    return value in ('float32', 'float16')
+
+
+# validators of the settings, with descriptions of the valid values
+validators = {
+    'max_batch_size': (_positive_int, 'a positive integer'),
+    'max_wait': (_non_negative_number, 'a non-negative number'),
+    'chunk_size': (_positive_int, 'a positive integer'),
+    'cache_size': (_non_negative_int, 'a non-negative integer'),
+    'disk_cache': (_optional_path, 'a path or None'),
+    'vector_dtype': (_vector_dtype, 'either "float32" or "float16"'),
+    'model_path': (_optional_path, 'a path or None'),
+    'stats': (_bool, 'a boolean'),
+    'max_vocab_size': (_non_negative_int, 'a non-negative integer'),
+}
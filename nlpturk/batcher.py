@@ -0,0 +1,205 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Optional, Callable, List, Any
+
+
+class MicroBatcher:
+    """Class that groups items submitted concurrently into micro-batches and processes
+    them together in a background thread. A batch is processed as soon as it reaches
+    `max_batch_size` items, or `max_batch_cost` total cost of the items, or `max_wait` 
+    seconds have passed since its first item arrived.
+
+    Identical items can be coalesced, an item submitted while an equal item is waiting 
+    or being processed is attached to the pending item and resolves to the same result, 
+    so that each unique item is processed once.
+    """
+
+    def __init__(
+        self,
+        process: Callable[[List[Any]], List[Any]],
+        max_batch_size: int = 32,
+        max_wait: float = 0.005,
+        max_batch_cost: Optional[int] = None,
+        cost: Optional[Callable[[Any], int]] = None,
+        max_queue_size: int = 0,
+        coalesce: bool = False
+    ) -> None:
+        """
+        Args:
+            process (Callable[[List[Any]], List[Any]]): Function that processes a batch of
+                items and returns a result for each item, in the same order. An exception 
+                returned as the result of an item is raised for that item only, an 
+                exception raised by the function is raised for all items of the batch.
+            max_batch_size (int, optional): Maximum number of items in a batch.
+                Defaults to 32.
+            max_wait (float, optional): Maximum time in seconds to wait for a batch to
+                fill up. Defaults to 0.005.
+            max_batch_cost (Optional[int], optional): Maximum total cost of the items in 
+                a batch, e.g. number of tokens. An item exceeding the budget alone makes 
+                up a batch. Defaults to None, batches are not bounded by cost.
+            cost (Optional[Callable[[Any], int]], optional): Function that returns the 
+                cost of an item. Required if `max_batch_cost` is set. Defaults to None.
+            max_queue_size (int, optional): Maximum number of items waiting to be 
+                processed, see `submit`. Defaults to 0, the queue is not bounded.
+            coalesce (bool, optional): Whether to coalesce identical items in flight. 
+                Items must be hashable. Defaults to False.
+        """
+        if not isinstance(max_batch_size, int) or max_batch_size < 1:
+            raise ValueError('"max_batch_size" must be a positive integer.')
+        if not isinstance(max_wait, (int, float)) or max_wait < 0:
+            raise ValueError('"max_wait" must be a non-negative number.')
+        if max_batch_cost is not None and (not isinstance(max_batch_cost, int) or
+                                           max_batch_cost < 1 or cost is None):
+            raise ValueError('"max_batch_cost" must be a positive integer and requires '
+                             'a "cost" function.')
+        if not isinstance(max_queue_size, int) or max_queue_size < 0:
+            raise ValueError('"max_queue_size" must be a non-negative integer.')
+        self.process = process
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_batch_cost = max_batch_cost
+        self.cost = cost
+        self._queue = queue.Queue(max_queue_size)
+        # item taken from the queue that did not fit in the previous batch
+        self._carry = None
+        self.coalesce = coalesce
+        # number of items attached to an equal item in flight
+        self.coalesced = 0
+        # futures of the items in flight by item, if coalescing
+        self._inflight = {}
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def qsize(self) -> int:
+        """Return the approximate number of items waiting to be processed.
+        """
+        return self._queue.qsize()
+
+    def submit(self, item: Any) -> Future:
+        """Submit an item to be processed with the next batch.
+
+        Args:
+            item (Any): Item to be processed.
+
+        Returns:
+            Future: Future object that resolves to the result of the item.
+
+        Raises:
+            queue.Full: If the queue has `max_queue_size` items waiting.
+        """
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, daemon=True,
+                                                    name='nlpturk-batcher')
+                    self._thread.start()
+        future = Future()
+        if not self.coalesce:
+            self._queue.put_nowait((item, future))
+            return future
+        with self._lock:
+            if item in self._inflight:
+                self._inflight[item].append(future)
+                self.coalesced += 1
+            else:
+                self._queue.put_nowait((item, future))
+                self._inflight[item] = [future]
+        return future
+
+    def _claim(self, item: Any, future: Future) -> bool:
+        """Mark an item of a batch as running.
+
+        Args:
+            item (Any): Item to be processed.
+            future (Future): Future object of the item.
+
+        Returns:
+            bool: Whether the item is to be processed, False if it is cancelled by all 
+                of its callers.
+        """
+        if not self.coalesce:
+            return future.set_running_or_notify_cancel()
+        with self._lock:
+            futures = [f for f in self._inflight[item] if not f.cancelled()]
+            if not futures:
+                del self._inflight[item]
+                return False
+            self._inflight[item] = futures
+            return True
+
+    def _resolve(self, item: Any, future: Future, result: Any = None,
+                 exception: Optional[Exception] = None) -> None:
+        """Set the result or the exception of an item on its future objects.
+
+        Args:
+            item (Any): Processed item.
+            future (Future): Future object of the item.
+            result (Any, optional): Result of the item. Defaults to None.
+            exception (Optional[Exception], optional): Exception raised while processing 
+                the item. Defaults to None.
+        """
+        if self.coalesce:
+            with self._lock:
+                futures = self._inflight.pop(item)
+        else:
+            futures = [future]
+        for f in futures:
+            # attached futures are pending until the result is set
+            if f.running() or f.set_running_or_notify_cancel():
+                if exception is not None:
+                    f.set_exception(exception)
+                else:
+                    f.set_result(result)
+
+    def _next_batch(self) -> List[Any]:
+        """Wait for the next batch of items.
+
+        Returns:
+            List[Any]: Items and futures of the batch.
+        """
+        if self._carry is not None:
+            batch, self._carry = [self._carry], None
+        else:
+            batch = [self._queue.get()]
+        total = self.cost(batch[0][0]) if self.max_batch_cost is not None else 0
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            timeout = deadline - time.monotonic()
+            try:
+                if timeout > 0:
+                    entry = self._queue.get(timeout=timeout)
+                else:
+                    # take items that are already waiting without blocking
+                    entry = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if self.max_batch_cost is not None:
+                total += self.cost(entry[0])
+                if total > self.max_batch_cost:
+                    self._carry = entry
+                    break
+            batch.append(entry)
+        return batch
+
+    def _run(self) -> None:
+        """Process batches until the interpreter exits.
+        """
+        while True:
+            # skip items that are cancelled by the caller
+            batch = [(item, future) for item, future in self._next_batch()
+                     if self._claim(item, future)]
+            if not batch:
+                continue
+            try:
+                results = self.process([item for item, _ in batch])
+            except Exception as e:
+                for item, future in batch:
+                    self._resolve(item, future, exception=e)
+            else:
+                for (item, future), result in zip(batch, results):
+                    if isinstance(result, Exception):
+                        self._resolve(item, future, exception=result)
+                    else:
+                        self._resolve(item, future, result)
@@ -0,0 +1,297 @@
+import os
+import time
+import sqlite3
+import hashlib
+import threading
+from pathlib import Path
+from collections import OrderedDict
+from typing import Optional, Iterable, Union, Tuple, List, Dict, Any
+
+
+def cache_key(text: str, components: Iterable[str]) -> bytes:
+    """Hash of the text and the pipeline components run on it.
+
+    Args:
+        text (str): Text to be processed.
+        components (Iterable[str]): Names of the pipeline components run on the text.
+
+    Returns:
+        bytes: Cache key.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    h.update(','.join(components).encode('utf-8'))
+    h.update(b'\x00')
+    h.update(text.encode('utf-8', 'surrogatepass'))
+    return h.digest()
+
+
+class LRUCache:
+    """Thread-safe in-memory cache of serialized documents. Memory usage is bounded by
+    the total size of the cached values in bytes, least recently used entries are evicted
+    first.
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        """
+        Args:
+            max_bytes (int): Memory budget of the cache in bytes.
+        """
+        if not isinstance(max_bytes, int) or max_bytes < 1:
+            raise ValueError('"max_bytes" must be a positive integer.')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        """Return the number of cached entries.
+        """
+        return len(self._data)
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Get a cached value and mark it as recently used.
+
+        Args:
+            key (bytes): Cache key.
+
+        Returns:
+            Optional[bytes]: Cached value, None if the key is not cached.
+        """
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._data.move_to_end(key)
+            return value
+
+    def get_many(self, keys: Iterable[bytes]) -> List[Optional[bytes]]:
+        """Get cached values, see `get`.
+
+        Args:
+            keys (Iterable[bytes]): Cache keys.
+
+        Returns:
+            List[Optional[bytes]]: Cached values, None for the keys that are not cached.
+        """
+        return [self.get(key) for key in keys]
+
+    def set(self, key: bytes, value: bytes) -> None:
+        """Cache a value. Values larger than the memory budget are not cached.
+
+        Args:
+            key (bytes): Cache key.
+            value (bytes): Value to be cached.
+        """
+        size = len(key) + len(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._data:
+                self._bytes -= len(key) + len(self._data.pop(key))
+            self._data[key] = value
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                k, v = self._data.popitem(last=False)
+                self._bytes -= len(k) + len(v)
+
+    def set_many(self, items: Iterable[Tuple[bytes, bytes]]) -> None:
+        """Cache values, see `set`.
+
+        Args:
+            items (Iterable[Tuple[bytes, bytes]]): Keys and values to be cached.
+        """
+        for key, value in items:
+            self.set(key, value)
+
+    def clear(self) -> None:
+        """Remove all cached entries.
+        """
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def info(self) -> Dict[str, int]:
+        """
+        Returns:
+            Dict[str, int]: Cache statistics, i.e. number of hits and misses, number
+                of entries, size of the entries and memory budget in bytes.
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._data),
+                    'bytes': self._bytes, 'max_bytes': self.max_bytes}
+
+
+class DiskCache:
+    """Persistent cache of serialized documents backed by a SQLite database. Entries are 
+    stored with the model version and only the entries of the same version are read, 
+    so that processes of different model versions can share the database, e.g. while 
+    a new model is rolled out. Entries of the versions not written for `max_age` seconds 
+    are evicted gradually on writes. The database is in write-ahead logging mode, so that 
+    multiple processes can read while another one writes.
+    """
+
+    # number of entries of the unused versions evicted on a write
+    evict_batch = 1000
+
+    def __init__(self, path: Union[str, Path], version: str, max_age: float = 86400) -> None:
+        """
+        Args:
+            path (Union[str, Path]): Path to the SQLite database file. 
+                Will be created if it doesn’t exist.
+            version (str): Model version of the cached entries.
+            max_age (float, optional): Time in seconds after the last write of a version, 
+                after which its entries are evicted. Defaults to 86400, one day.
+        """
+        self.path = str(path)
+        self.version = version
+        self.max_age = max_age
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            columns = [r[1] for r in conn.execute('PRAGMA table_info(docs)')]
+            # entries of the earlier format are not bound to a version
+            if columns and 'version' not in columns:
+                conn.execute('DROP TABLE docs')
+                conn.execute('DROP TABLE IF EXISTS meta')
+            conn.execute('CREATE TABLE IF NOT EXISTS docs (version TEXT, key BLOB, '
+                         'value BLOB, PRIMARY KEY (version, key)) WITHOUT ROWID')
+            conn.execute('CREATE TABLE IF NOT EXISTS versions '
+                         '(version TEXT PRIMARY KEY, used REAL)')
+            self._touch(conn)
+
+    def _touch(self, conn: sqlite3.Connection) -> None:
+        """Marks the model version as used, within the current transaction.
+
+        Args:
+            conn (sqlite3.Connection): Database connection.
+        """
+        conn.execute('INSERT OR REPLACE INTO versions VALUES (?, ?)',
+                     (self.version, time.time()))
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Deletes a batch of the entries of the unused versions, within the current 
+        transaction. Versions without entries are forgotten.
+
+        Args:
+            conn (sqlite3.Connection): Database connection.
+        """
+        stale = [r[0] for r in conn.execute(
+            'SELECT version FROM versions WHERE version != ? AND used < ?',
+            (self.version, time.time() - self.max_age))]
+        budget = self.evict_batch
+        for version in stale:
+            deleted = conn.execute(
+                'DELETE FROM docs WHERE version = ? AND key IN '
+                '(SELECT key FROM docs WHERE version = ? LIMIT ?)',
+                (version, version, budget)).rowcount
+            if deleted < budget:
+                conn.execute('DELETE FROM versions WHERE version = ?', (version,))
+            budget -= deleted
+            if budget <= 0:
+                break
+
+    def _connect(self) -> sqlite3.Connection:
+        """Returns the database connection of the current thread. Connections are not 
+        shared across threads and forked processes.
+
+        Returns:
+            sqlite3.Connection: Database connection.
+        """
+        if getattr(self._local, 'pid', None) != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=60, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn, self._local.pid = conn, os.getpid()
+        return self._local.conn
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        """Get a cached value.
+
+        Args:
+            key (bytes): Cache key.
+
+        Returns:
+            Optional[bytes]: Cached value, None if the key is not cached.
+        """
+        return self.get_many([key])[0]
+
+    def get_many(self, keys: Iterable[bytes]) -> List[Optional[bytes]]:
+        """Get cached values.
+
+        Args:
+            keys (Iterable[bytes]): Cache keys.
+
+        Returns:
+            List[Optional[bytes]]: Cached values, None for the keys that are not cached.
+        """
+        keys, found = list(keys), {}
+        conn = self._connect()
+        # stay below the maximum number of host parameters of SQLite
+        for i in range(0, len(keys), 500):
+            batch = keys[i:i + 500]
+            query = ('SELECT key, value FROM docs WHERE version = ? AND '
+                     f'key IN ({",".join("?" * len(batch))})')
+            found.update(conn.execute(query, [self.version, *batch]).fetchall())
+        values = [found.get(key) for key in keys]
+        hits = sum(v is not None for v in values)
+        self.hits += hits
+        self.misses += len(values) - hits
+        return values
+
+    def set(self, key: bytes, value: bytes) -> None:
+        """Cache a value.
+
+        Args:
+            key (bytes): Cache key.
+            value (bytes): Value to be cached.
+        """
+        self.set_many([(key, value)])
+
+    def set_many(self, items: Iterable[Tuple[bytes, bytes]]) -> None:
+        """Cache values in a single transaction, and evict a batch of the entries of the 
+        unused versions.
+
+        Args:
+            items (Iterable[Tuple[bytes, bytes]]): Keys and values to be cached.
+        """
+        items = list(items)
+        if not items:
+            return
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.executemany('INSERT OR REPLACE INTO docs VALUES (?, ?, ?)',
+                             [(self.version, k, v) for k, v in items])
+            self._touch(conn)
+            self._evict(conn)
+
+    def clear(self) -> None:
+        """Remove all cached entries of the model version.
+        """
+        conn = self._connect()
+        with conn:
+            conn.execute('BEGIN IMMEDIATE')
+            conn.execute('DELETE FROM docs WHERE version = ?', (self.version,))
+
+    def info(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: Cache statistics, i.e. number of hits and misses of this 
+                process, number of entries of the model version, database path and model 
+                version.
+        """
+        entries = self._connect().execute('SELECT COUNT(*) FROM docs WHERE version = ?',
+                                          (self.version,)).fetchone()[0]
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries,
+                'path': self.path, 'version': self.version}
@@ -1,24 +1,167 @@
+from typing import Iterable, Callable, Dict, List, Any
+
 import numpy as np
 from spacy.tokens.doc import Doc
 from spacy.tokens.span import Span
 from spacy.tokens import Token as Token_
 
 from .utils import lower, islower, isupper, istitle
+from ._config import settings
+
+
+# document level annotations, stored per document in `Doc.user_data`
+Doc.set_extension('text', default=None, force=True)
+Doc.set_extension('idx', default=None, force=True)
+Doc.set_extension('ws', default=None, force=True)
+Doc.set_extension('components', default=None, force=True)
+
+# spaCy lexical attributes of the token properties
+_flags = {'is_alpha': 'IS_ALPHA', 'is_ascii': 'IS_ASCII', 'is_bracket': 'IS_BRACKET',
+          'is_currency': 'IS_CURRENCY', 'is_digit': 'IS_DIGIT', 'is_punct': 'IS_PUNCT',
+          'is_quote': 'IS_QUOTE', 'is_stop_word': 'IS_STOP', 'like_email': 'LIKE_EMAIL',
+          'like_num': 'LIKE_NUM', 'like_url': 'LIKE_URL'}
+# token properties with Turkish casing rules
+_casing = {'is_lower': islower, 'is_upper': isupper, 'is_title': istitle}
+# pipeline components annotating the token properties
+_annotations = {'lemma': ('lemmatizer',), 'pos': ('tagger',), 'is_sent_start': ('sbd',),
+                'is_sent_end': ('sbd',)}
+_attrs = ['text', 'lemma', 'pos', 'idx', 'is_sent_start', 'is_sent_end',
+          *_casing, *_flags]
+
+
+def _require(doc: Doc, attr: str, *components: str) -> None:
+    """Ensures that the attribute is annotated by the pipeline components run on 
+    the document.
+
+    Args:
+        doc (Doc): spaCy Doc object.
+        attr (str): Attribute name.
+        *components (str): Names of the pipeline components, either of them 
+            annotates the attribute.
+    """
+    # documents processed without component selection have all annotations
+    if doc._.components is None or any(c in doc._.components for c in components):
+        return
+    components = ' or '.join(f'`{c}`' for c in components)
+    raise ValueError(f'The attribute `{attr}` is not available, as the {components} '
+                     'component was skipped while processing the document.')
+
+
+def _map(doc: Doc, attr: str, func: Callable[[str], Any], dtype: Any) -> np.ndarray:
+    """Applies a function to the strings of a spaCy attribute, once for each unique string.
+
+    Args:
+        doc (Doc): spaCy Doc object.
+        attr (str): spaCy attribute name, e.g. `ORTH`, `LEMMA`.
+        func (Callable[[str], Any]): Function to be applied.
+        dtype (Any): Data type of the output array.
+
+    Returns:
+        numpy.ndarray: Function outputs, one for each token.
+    """
+    uniq, inverse = np.unique(doc.to_array(attr), return_inverse=True)
+    values = np.array([func(doc.vocab.strings[int(h)]) for h in uniq], dtype=dtype)
+    return values[inverse]
+
+
+def _pool(doc: Doc) -> np.ndarray:
+    """Pools the transformer outputs into token vectors. Token vectors are the mean of 
+    the aligned subtoken vectors, tokens without subtokens have zero vectors.
+
+    Args:
+        doc (Doc): spaCy Doc object annotated by a transformer.
+
+    Returns:
+        numpy.ndarray[ndim=2]: Token vectors as 2D numpy array, in the data type of 
+            the transformer outputs.
+    """
+    trf_data = doc._.trf_data
+    tensor = trf_data.tensors[0]
+    tensor = tensor.get() if hasattr(tensor, 'get') else tensor
+    # subtoken vectors of all spans, indexed by the alignment
+    tensor = tensor.reshape(-1, tensor.shape[-1])
+    indices = trf_data.align.dataXd.ravel()
+    lengths = trf_data.align.lengths
+    indices = indices.get() if hasattr(indices, 'get') else indices
+    lengths = lengths.get() if hasattr(lengths, 'get') else lengths
+
+    vectors = np.zeros((len(lengths), tensor.shape[-1]), dtype=tensor.dtype)
+    nonzero = lengths > 0
+    if nonzero.any():
+        starts = np.cumsum(lengths) - lengths
+        # segments of the tokens without subtokens are empty, skip them
+        sums = np.add.reduceat(tensor[indices], starts[nonzero], axis=0, dtype='float32')
+        vectors[nonzero] = sums / lengths[nonzero, None]
+    return vectors
+
+
+def _mean(vectors: np.ndarray) -> np.ndarray:
+    """Mean of the vectors, computed in single precision.
+
+    Args:
+        vectors (numpy.ndarray[ndim=2]): Vectors as 2D numpy array.
+
+    Returns:
+        numpy.ndarray[ndim=1]: Mean vector in the data type of the vectors.
+    """
+    if not len(vectors):
+        return np.zeros(vectors.shape[-1], dtype=vectors.dtype)
+    return vectors.mean(axis=0, dtype='float32').astype(vectors.dtype, copy=False)
+
+
+class _Vectors:
+    """Token vectors of a document, computed on first access. Shared by the document 
+    and its token and sentence objects, which do not reference the document, so that 
+    they are freed by reference counting, without the cyclic garbage collector.
+    """
+
+    __slots__ = ('_doc', '_vectors')
+
+    def __init__(self, doc: Doc) -> None:
+        """
+        Args:
+            doc (Doc): spaCy Doc object.
+        """
+        self._doc = doc
+        self._vectors = None
+
+    def get(self) -> np.ndarray:
+        """Returns token vectors of the document as a matrix, see `Token.vector`. 
+        Transformer outputs are pooled on first access.
+
+        Returns:
+            numpy.ndarray[ndim=2]: Token vectors as 2D numpy array.
+        """
+        if self._vectors is None:
+            doc = self._doc
+            if not doc.vocab.vectors.size and doc.tensor.size:
+                # outputs of tok2vec component
+                self._vectors = doc.tensor
+            elif not doc.vocab.vectors.size and getattr(doc._, 'trf_data', None) is not None:
+                self._vectors = _pool(doc)
+            else:
+                # static word vectors
+                self._vectors = np.array([t.vector for t in doc],
+                                         dtype=settings['vector_dtype']).reshape(len(doc), -1)
+        return self._vectors
 
 
 class Token:
     """Class that encapsulates the spaCy Token object. Modifies and hides some token attributes.
-    The spaCy Token object is available via `_token` attribute.  
+    The spaCy Token object is available via `_token` attribute. Token objects are created 
+    once for each document and reused.
     """
 
-    def __init__(self, token: Token_):
+    __slots__ = ('_token', '_vectors', 'i')
+
+    def __init__(self, token: Token_, vectors: _Vectors):
         """
         Args:
             token (Token_): spaCy Token object.
-            offsets: Tuple[int, str]: The character offset and trailing whitespaces 
-                of the token within the document. 
+            vectors (_Vectors): Token vectors of the document.
         """
         self._token = token
+        self._vectors = vectors
         self.i = token.i
 
     def __len__(self):
@@ -44,7 +187,7 @@ class Token:
             int: The character offset of the token within the document.
         """
         # set aligned token offset
-        return self._token.doc._.idx[self.i]
+        return int(self._token.doc._.idx[self.i])
 
     @property
     def pos(self):
@@ -52,6 +195,7 @@ class Token:
         Returns:
             str: Coarse-grained part-of-speech tag.
         """
+        _require(self._token.doc, 'pos', 'tagger')
         return self._token.tag_
 
     @property
@@ -60,6 +204,7 @@ class Token:
         Returns:
             str: The token lemma.
         """
+        _require(self._token.doc, 'lemma', 'lemmatizer')
         return lower(self._token.lemma_)
 
     @property
@@ -68,6 +213,7 @@ class Token:
         Returns:
             bool: Whether the token ends a sentence.
         """
+        _require(self._token.doc, 'is_sent_end', 'sbd')
         return self._token._.sent_end
 
     @property
@@ -76,6 +222,7 @@ class Token:
         Returns:
             bool: Whether the token starts a sentence.
         """
+        _require(self._token.doc, 'is_sent_start', 'sbd')
         return bool(self._token.is_sent_start)
 
     @property
@@ -116,15 +263,11 @@ class Token:
         subtoken vectors for transformer models. 
 
         Returns:
-            numpy.ndarray[ndim=1, dtype='float32']: Token vector as 1D numpy array.
+            numpy.ndarray[ndim=1]: Token vector as 1D numpy array, in the data type of 
+                `vector_dtype` setting.
         """
-        vector = self._token.vector
-        if not vector.size and hasattr(self._token.doc._, 'trf_data'):
-            trf_vector = []
-            for i in self._token.doc._.trf_data.align[self.i].data:
-                trf_vector.append(self._token.doc._.trf_data.tensors[0][0][i])
-            vector = np.mean(np.array(trf_vector), axis=0)
-        return vector
+        _require(self._token.doc, 'vector', 'tok2vec', 'transformer')
+        return self._vectors.get()[self.i]
 
     @property
     def text(self):
@@ -140,8 +283,10 @@ class Token:
         Returns:
             str: The text of the token with trailing whitespaces if exist.
         """
-        tws = self.text + self._token.doc._.ws[self.i]
-        return tws if self.i > 0 else self._token.doc._.lws + tws
+        doc = self._token.doc
+        start = int(doc._.idx[self.i]) if self.i > 0 else 0
+        end = int(doc._.idx[self.i]) + len(self._token) + int(doc._.ws[self.i])
+        return doc._.text[start:end]
 
     @property
     def is_alpha(self):
@@ -229,18 +374,24 @@ class Sent:
     via `_span` attribute.
     """
 
-    def __init__(self, span: Span) -> None:
+    __slots__ = ('_span', '_tokens', '_vectors')
+
+    def __init__(self, span: Span, document: 'Document') -> None:
         """
         Args:
             span (Span): spaCy Span object.
+            document (Document): Document object of the sentence, token objects of 
+                the document are reused.
         """
         self._span = span
+        # the document is not referenced, see `_Vectors`
+        self._tokens = document._get_tokens()
+        self._vectors = document._vectors
 
     def __iter__(self):
-        """Iterate over the tokens in the document.
+        """Iterate over the tokens in the sentence.
         """
-        for token in self._span:
-            yield Token(token)
+        return iter(self._tokens[self._span.start:self._span.end])
 
     def __getitem__(self, i: int) -> Token:
         """Return token at index `i`.
@@ -253,7 +404,7 @@ class Sent:
         """
         if not isinstance(i, int):
             raise ValueError('The attribute value should be an integer.')
-        return Token(self._span.__getitem__(i))
+        return self._tokens[self._span.__getitem__(i).i]
 
     def __len__(self):
         """Return the number of tokens in the sentence.
@@ -269,7 +420,8 @@ class Sent:
         Returns:
             str: The text of the sentence.
         """
-        return self.text_with_ws.rstrip()
+        start = 0 if self._span.start == 0 else self.start_char
+        return self._span.doc._.text[start:self.end_char]
 
     @property
     def text_with_ws(self):
@@ -277,7 +429,29 @@ class Sent:
         Returns:
             str: The text of the sentence with trailing whitespaces if exist.
         """
-        return ''.join(Token(t).text_with_ws for t in self._span)
+        start = 0 if self._span.start == 0 else self.start_char
+        end = self.end_char + int(self._span.doc._.ws[self._span.end - 1]) if self._span else 0
+        return self._span.doc._.text[start:end]
+
+    @property
+    def start_char(self):
+        """
+        Returns:
+            int: The character offset of the sentence within the document.
+        """
+        return int(self._span.doc._.idx[self._span.start]) if self._span else 0
+
+    @property
+    def end_char(self):
+        """
+        Returns:
+            int: The character offset of the end of the sentence within the document, 
+                trailing whitespaces excluded.
+        """
+        if not self._span:
+            return 0
+        last = self._span.end - 1
+        return int(self._span.doc._.idx[last]) + len(self._span.doc[last])
 
     @property
     def start(self):
@@ -300,12 +474,11 @@ class Sent:
         """Vector representation of the sentence as the mean of the token vectors.
 
         Returns:
-            numpy.ndarray[ndim=1, dtype='float32']: Sentence vector as 1D numpy array.
+            numpy.ndarray[ndim=1]: Sentence vector as 1D numpy array, in the data type of 
+                `vector_dtype` setting.
         """
-        vector = self._span.vector
-        if not vector.size and hasattr(self._span.doc._, 'trf_data'):
-            vector = sum(Token(t).vector for t in self._span) / len(self._span)
-        return vector
+        _require(self._span.doc, 'vector', 'tok2vec', 'transformer')
+        return _mean(self._vectors.get()[self._span.start:self._span.end])
 
 
 class Document:
@@ -319,12 +492,14 @@ class Document:
             doc (Doc): spaCy Doc object.
         """
         self._doc = doc
+        self._tokens = None
+        self._sents = None
+        self._vectors = _Vectors(doc)
 
     def __iter__(self):
         """Iterate over the tokens in the document.
         """
-        for token in self._doc:
-            yield Token(token)
+        return iter(self._get_tokens())
 
     def __getitem__(self, i: int) -> Token:
         """Return token at index `i`.
@@ -337,7 +512,7 @@ class Document:
         """
         if not isinstance(i, int):
             raise ValueError('The attribute value should be an integer.')
-        return Token(self._doc.__getitem__(i))
+        return self._get_tokens()[i]
 
     def __len__(self):
         """Return the number of tokens in the document.
@@ -360,28 +535,104 @@ class Document:
     def sents(self):
         """Iterate over the sentences in the document.
         """
-        if not self._doc.has_annotation('SENT_START'):
-            yield Sent(Span(self._doc, 0, len(self._doc)))
-        else:
-            for sent in self._doc.sents:
-                yield Sent(sent)
+        _require(self._doc, 'sents', 'sbd')
+        if self._sents is None:
+            if not self._doc.has_annotation('SENT_START'):
+                self._sents = [Sent(Span(self._doc, 0, len(self._doc)), self)]
+            else:
+                self._sents = [Sent(sent, self) for sent in self._doc.sents]
+        yield from self._sents
 
     @property
     def text(self):
         """
         Returns:
-            str: The string representation of the document text. 
+            str: The original text of the document. 
         """
-        return ''.join(Token(t).text_with_ws for t in self._doc)
+        return self._doc._.text
+
+    def to_arrays(self, attrs: Iterable[str], as_ids: bool = False) -> Dict[str, np.ndarray]:
+        """Export token attributes of the document as arrays, one element for each token. 
+        Attributes are named after the token properties, i.e. `text`, `lemma`, `pos`, `idx`, 
+        `is_sent_start`, `is_sent_end`, `is_lower`, `is_upper`, `is_title`, `is_stop_word`, 
+        `is_alpha`, `is_ascii`, `is_bracket`, `is_currency`, `is_digit`, `is_punct`, 
+        `is_quote`, `like_email`, `like_num` and `like_url`.
+
+        Usage:
+            arrays = doc.to_arrays(['lemma', 'pos', 'is_punct'])
+            lemmas = arrays['lemma'][~arrays['is_punct']]
+
+        Args:
+            attrs (Iterable[str]): Names of the token attributes.
+            as_ids (bool, optional): Whether to export `text`, `lemma` and `pos` as ids 
+                of the interned strings, ids are resolved with `doc._doc.vocab.strings`. 
+                Defaults to False.
+
+        Returns:
+            Dict[str, numpy.ndarray]: Arrays by attribute name. Strings are exported as 
+                object arrays or uint64 arrays of ids, `idx` as int32 array and the other 
+                attributes as bool arrays.
+        """
+        doc, attrs, arrays = self._doc, list(attrs), {}
+        unknown = [a for a in attrs if a not in _attrs]
+        if unknown:
+            raise ValueError(f'Unknown attributes: {", ".join(unknown)}. '
+                             f'Available attributes: {", ".join(_attrs)}.')
+        for attr in attrs:
+            if attr in _annotations:
+                _require(doc, attr, *_annotations[attr])
+
+        flags = [a for a in attrs if a in _flags]
+        if flags:
+            values = doc.to_array([_flags[a] for a in flags]).reshape(len(doc), len(flags))
+            arrays.update(zip(flags, values.astype(bool).T))
+        for attr in attrs:
+            if attr in _casing:
+                arrays[attr] = _map(doc, 'ORTH', _casing[attr], bool)
+        if 'text' in attrs:
+            arrays['text'] = doc.to_array('ORTH') if as_ids else \
+                _map(doc, 'ORTH', str, object)
+        if 'pos' in attrs:
+            arrays['pos'] = doc.to_array('TAG') if as_ids else _map(doc, 'TAG', str, object)
+        if 'lemma' in attrs:
+            arrays['lemma'] = _map(doc, 'LEMMA', lambda s: doc.vocab.strings.add(lower(s)),
+                                   np.uint64) if as_ids else _map(doc, 'LEMMA', lower, object)
+        if 'idx' in attrs:
+            arrays['idx'] = doc._.idx.copy()
+        if 'is_sent_start' in attrs or 'is_sent_end' in attrs:
+            starts = doc.to_array('SENT_START') == 1
+            starts[:1] = True
+            arrays['is_sent_start'] = starts
+            # sentence ends precede the sentence starts, except the last token
+            arrays['is_sent_end'] = np.append(starts[1:], [doc[-1]._.sent_end] if len(doc)
+                                              else []).astype(bool)
+        return {attr: arrays[attr] for attr in attrs}
 
     @property
     def vector(self):
         """Vector representation of the document as the mean of the token vectors.
 
         Returns:
-            numpy.ndarray[ndim=1, dtype='float32']: Sentence vector as 1D numpy array.
+            numpy.ndarray[ndim=1]: Document vector as 1D numpy array, in the data type of 
+                `vector_dtype` setting.
+        """
+        _require(self._doc, 'vector', 'tok2vec', 'transformer')
+        return _mean(self._get_vectors())
+
+    def _get_tokens(self) -> List[Token]:
+        """Returns token objects of the document, creates them on first access.
+
+        Returns:
+            List[Token]: Token objects.
+        """
+        if self._tokens is None:
+            self._tokens = [Token(token, self._vectors) for token in self._doc]
+        return self._tokens
+
+    def _get_vectors(self) -> np.ndarray:
+        """Returns token vectors of the document as a matrix, see `_Vectors`.
+
+        Returns:
+            numpy.ndarray[ndim=2]: Token vectors as 2D numpy array.
         """
-        vector = self._doc.vector
-        if not vector.size and hasattr(self._doc._, 'trf_data'):
-            vector = sum(Token(t).vector for t in self._doc) / len(self._doc)
-        return vector
+        return self._vectors.get()
@@ -0,0 +1,39 @@
+import os
+from typing import Union, Dict
+
+
+# fields of `/proc/<pid>/smaps_rollup` by report name
+_fields = {'Rss': 'rss', 'Pss': 'pss', 'Shared_Clean': 'shared_clean',
+           'Shared_Dirty': 'shared_dirty', 'Private_Clean': 'private_clean',
+           'Private_Dirty': 'private_dirty'}
+
+
+def memory_usage(pid: Union[int, str] = 'self') -> Dict[str, int]:
+    """Memory usage of a process, read from `/proc/<pid>/smaps_rollup` on Linux. Shared
+    memory is the memory of the pages mapped by other processes too, e.g. the model
+    weights loaded before forking, private memory is mapped by the process only. The
+    proportional set size (PSS) splits the shared pages among the processes mapping
+    them, the sum of the PSS of the workers is their total memory usage.
+
+    Args:
+        pid (Union[int, str], optional): Process id. Defaults to 'self', the current
+            process.
+
+    Returns:
+        Dict[str, int]: Memory usage in KiB, i.e. `rss`, `pss`, `shared_clean`,
+            `shared_dirty`, `private_clean`, `private_dirty`, and the totals `shared`
+            and `private`.
+    """
+    path = os.path.join('/proc', str(pid), 'smaps_rollup')
+    if not os.path.exists(path):
+        raise ValueError(f'`{path}` does not exist. Memory usage is available on Linux '
+                         '4.14 or later.')
+    usage = dict.fromkeys(_fields.values(), 0)
+    with open(path) as f:
+        for line in f:
+            parts = line.split()
+            if parts and parts[0].rstrip(':') in _fields:
+                usage[_fields[parts[0].rstrip(':')]] = int(parts[1])
+    usage['shared'] = usage['shared_clean'] + usage['shared_dirty']
+    usage['private'] = usage['private_clean'] + usage['private_dirty']
+    return usage
@@ -0,0 +1,117 @@
+import math
+import threading
+from typing import Dict, Any
+
+
+class Histogram:
+    """Histogram of durations with logarithmic buckets. Recording is constant time and
+    memory, percentiles are estimated within the relative error of a bucket, about 9%.
+    """
+
+    # buckets per doubling, and the smallest and the largest durations in seconds
+    resolution = 8
+    min_value = 1e-6
+    max_value = 1e4
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self._counts = [0] * (self._bucket(self.max_value) + 1)
+
+    def _bucket(self, value: float) -> int:
+        """
+        Args:
+            value (float): Duration in seconds.
+
+        Returns:
+            int: Bucket index of the duration.
+        """
+        if value <= self.min_value:
+            return 0
+        value = min(value, self.max_value)
+        return int(math.log2(value / self.min_value) * self.resolution) + 1
+
+    def record(self, value: float) -> None:
+        """Record a duration.
+
+        Args:
+            value (float): Duration in seconds.
+        """
+        self._counts[self._bucket(value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, q: float) -> float:
+        """Estimate a percentile of the recorded durations.
+
+        Args:
+            q (float): Percentile in the [0, 100] range.
+
+        Returns:
+            float: Upper bound of the bucket of the percentile in seconds, 0.0 if no
+                duration is recorded.
+        """
+        if not self.count:
+            return 0.0
+        rank, seen = math.ceil(q / 100 * self.count), 0
+        for i, n in enumerate(self._counts):
+            seen += n
+            if seen >= max(rank, 1):
+                upper = self.min_value * 2 ** (i / self.resolution)
+                return min(upper, self.max)
+        return self.max
+
+
+class Stats:
+    """Thread-safe recorder of the call counts, token counts and durations of the
+    processing stages, e.g. tokenizer, pipeline components.
+    """
+
+    def __init__(self) -> None:
+        self._stages = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float, tokens: int) -> None:
+        """Record a call of a stage.
+
+        Args:
+            stage (str): Stage name.
+            seconds (float): Duration of the call in seconds.
+            tokens (int): Number of tokens processed in the call.
+        """
+        with self._lock:
+            if stage not in self._stages:
+                self._stages[stage] = {'tokens': 0, 'histogram': Histogram()}
+            self._stages[stage]['tokens'] += tokens
+            self._stages[stage]['histogram'].record(seconds)
+
+    def reset(self) -> None:
+        """Remove all records.
+        """
+        with self._lock:
+            self._stages.clear()
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns:
+            Dict[str, Dict[str, Any]]: Statistics by stage name, i.e. number of calls
+                and tokens, total time in seconds, throughput in tokens per second,
+                and p50, p95, p99 and maximum durations of a call in seconds.
+        """
+        with self._lock:
+            summary = {}
+            for stage, data in self._stages.items():
+                h = data['histogram']
+                summary[stage] = {
+                    'calls': h.count,
+                    'tokens': data['tokens'],
+                    'seconds': h.total,
+                    'tokens_per_sec': data['tokens'] / h.total if h.total else 0.0,
+                    'p50': h.percentile(50),
+                    'p95': h.percentile(95),
+                    'p99': h.percentile(99),
+                    'max': h.max,
+                }
+            return summary
@@ -0,0 +1,130 @@
+import os
+import json
+import hashlib
+from pathlib import Path
+from typing import Union
+
+import numpy as np
+import spacy
+import srsly
+from spacy.language import Language
+
+from .pipeline import sbd
+
+
+WEIGHTS = 'weights.bin'
+WEIGHTS_INDEX = 'weights.json'
+# offsets of the weights are aligned for vectorized operations
+_ALIGNMENT = 64
+# files up to this size are fingerprinted by content, larger ones by size and mtime
+_FINGERPRINT_SIZE = 1024 * 1024
+
+
+def export_fast(model_path: Union[str, Path], output_path: Union[str, Path]) -> None:
+    """Export a trained model to the fast-load format. The weights of the pipeline
+    components are moved out of the serialized components into a single file, so that
+    they are memory-mapped on load instead of being decoded and copied. Processes on
+    the same host share the pages of the weights through the page cache.
+
+    Transformer weights are serialized by PyTorch and are not moved.
+
+    Args:
+        model_path (Union[str, Path]): Path to the trained model directory.
+        output_path (Union[str, Path]): Path to the directory to save exported model.
+            Will be created if it doesn’t exist.
+    """
+    output_path = Path(output_path)
+    nlp = spacy.load(model_path)
+    nlp.to_disk(output_path)
+
+    index, offset = {}, 0
+    with open(output_path / WEIGHTS, 'wb') as f:
+        for name in nlp.pipe_names:
+            model_file = output_path / name / 'model'
+            if not model_file.is_file():
+                continue
+            msg = srsly.msgpack_loads(model_file.read_bytes())
+            entries = []
+            for i, params in enumerate(msg['params']):
+                for param, value in params.items():
+                    if value is None:
+                        continue
+                    value = np.ascontiguousarray(value)
+                    padding = -offset % _ALIGNMENT
+                    f.write(b'\0' * padding)
+                    offset += padding
+                    f.write(value.tobytes())
+                    entries.append({'node': i, 'param': param, 'dtype': value.dtype.str,
+                                    'shape': list(value.shape), 'offset': offset})
+                    offset += value.nbytes
+                # the weights are set from the weights file on load
+                msg['params'][i] = {p: v for p, v in params.items() if v is None}
+            model_file.write_bytes(srsly.msgpack_dumps(msg))
+            index[name] = entries
+
+    with open(output_path / WEIGHTS_INDEX, 'w', encoding='utf-8') as f:
+        json.dump({'pipes': index}, f)
+
+
+def fingerprint(model_path: Union[str, Path]) -> str:
+    """Fingerprint of a model directory, which changes when the model is retrained, 
+    unlike the model name and version in the meta that are not updated by training. 
+    Small files, e.g. `config.cfg`, `meta.json`, labels, are hashed by content, the 
+    weights files by size and modification time, so that large models are not read.
+
+    Args:
+        model_path (Union[str, Path]): Path to the model directory.
+
+    Returns:
+        str: Hex digest of the fingerprint.
+    """
+    model_path = Path(model_path)
+    h = hashlib.blake2b(digest_size=16)
+    for path in sorted(p for p in model_path.rglob('*') if p.is_file()):
+        stat = path.stat()
+        h.update(path.relative_to(model_path).as_posix().encode('utf-8'))
+        h.update(b'\x00')
+        if stat.st_size <= _FINGERPRINT_SIZE:
+            h.update(path.read_bytes())
+        else:
+            h.update(f'{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+        h.update(b'\x00')
+    return h.hexdigest()
+
+
+def is_fast(model_path: Union[str, Path]) -> bool:
+    """
+    Args:
+        model_path (Union[str, Path]): Path to the model directory.
+
+    Returns:
+        bool: Whether the model is exported to the fast-load format.
+    """
+    return os.path.isfile(os.path.join(model_path, WEIGHTS_INDEX))
+
+
+def load_fast(model_path: Union[str, Path]) -> Language:
+    """Load a model exported to the fast-load format, see `export_fast`. Weights are
+    memory-mapped copy-on-write.
+
+    Args:
+        model_path (Union[str, Path]): Path to the exported model directory.
+
+    Returns:
+        Language: spaCy Language object.
+    """
+    model_path = Path(model_path)
+    index = srsly.read_json(model_path / WEIGHTS_INDEX)
+    nlp = spacy.load(model_path)
+    if not os.path.getsize(model_path / WEIGHTS):
+        return nlp
+    weights = np.memmap(model_path / WEIGHTS, dtype=np.uint8, mode='c')
+    for name, entries in index['pipes'].items():
+        # nodes are serialized in the walk order of the model
+        nodes = list(nlp.get_pipe(name).model.walk())
+        for e in entries:
+            dtype = np.dtype(e['dtype'])
+            size = int(np.prod(e['shape'])) * dtype.itemsize
+            value = weights[e['offset']:e['offset'] + size].view(dtype).reshape(e['shape'])
+            nodes[e['node']].set_param(e['param'], value)
+    return nlp
@@ -1,11 +1,66 @@
 import re
+from typing import Iterable, Pattern
 
 import spacy
 from spacy.tokens import Doc
+from spacy.vocab import Vocab
 from spacy.language import Language
 from .tld import TLD
 
 
+def _trie_pattern(words: Iterable[str]) -> str:
+    """Builds a regex alternation of words from their trie, so that the common prefixes 
+    are matched once instead of trying every word, e.g. `com|co|cat` -> `c(?:o(?:m)?|at)`.
+
+    Args:
+        words (Iterable[str]): Words to be matched.
+
+    Returns:
+        str: Regex pattern matching the same strings as the plain alternation.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def pattern(node):
+        end = '' in node
+        branches = [re.escape(c) + pattern(child) for c, child in sorted(node.items()) if c]
+        if not branches:
+            return ''
+        if len(branches) == 1 and (not end or len(branches[0]) == 1):
+            group = branches[0]
+        else:
+            group = f'(?:{"|".join(branches)})'
+        return f'{group}?' if end else group
+
+    return pattern(trie)
+
+
+def _url_pattern(tld: str) -> Pattern:
+    """Compiles the url pattern. https://gist.github.com/gruber/8891611
+
+    Args:
+        tld (str): Regex pattern of the top level domains.
+
+    Returns:
+        Pattern: Compiled url pattern.
+    """
+    return re.compile(
+        fr'(?i)\b((?:https?:(?:/{{1,3}}|[a-z0-9%])|[a-z0-9.\-]+[.](?:{tld})/)'
+        r'(?:[^\s()<>{}\[\]]+|\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\))+'
+        r'(?:\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\)|[^\s`!()\[\]{{}};:\'"'
+        fr'.,<>?«»“”‘’])|(?:(?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+)*[.](?:{tld})\b/?(?!@)))'
+    )
+
+
+# compiled once, as the pattern of ~1500 top level domains is expensive to build
+_url = _url_pattern(_trie_pattern(TLD))
+_brackets = re.compile(r'([({\[<)}\]>«»“”„‟‹›❝❞❟❠❮❯〝〞〟＂"‘’‚‛❛❜])')
+
+
 class Tokenizer:
     """Class for Turkish text tokenization. Applies a more robust url match pattern based
     on a list of valid top level domains.
@@ -16,22 +71,26 @@ class Tokenizer:
         self.nlp.max_length = nlp.max_length
         self.vocab = nlp.vocab
 
+    def reset(self, vocab: Vocab) -> None:
+        """Replaces the vocabulary of the documents and the internal vocabulary of the 
+        tokenizer, which grow with the strings of the tokenized texts.
+
+        Args:
+            vocab (Vocab): Vocabulary of the documents.
+        """
+        max_length = self.nlp.max_length
+        self.nlp = spacy.blank('tr')
+        self.nlp.max_length = max_length
+        self.vocab = vocab
+
     def _is_url(self, text: str) -> bool:
         """Checks whether the string is a valid url or not.
         https://gist.github.com/gruber/8891611
         """
-        tld = '|'.join(TLD)
-        pattern = re.compile(
-            fr'(?i)\b((?:https?:(?:/{{1,3}}|[a-z0-9%])|[a-z0-9.\-]+[.](?:{tld})/)'
-            r'(?:[^\s()<>{}\[\]]+|\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\))+'
-            r'(?:\([^\s()]*?\([^\s()]+\)[^\s()]*?\)|\([^\s]+?\)|[^\s`!()\[\]{{}};:\'"'
-            fr'.,<>?«»“”‘’])|(?:(?<!@)[a-z0-9]+(?:[.\-][a-z0-9]+)*[.](?:{tld})\b/?(?!@)))'
-        )
-        return bool(pattern.match(text))
+        return bool(_url.match(text))
 
     def __call__(self, text):
         words, spaces = [], []
-        pattern = '[({\[<)}\]>«»“”„‟‹›❝❞❟❠❮❯〝〞〟＂"‘’‚‛❛❜]'
         for token in self.nlp(text):
             # ensure whether the token is a valid url
             if token.like_url and not self._is_url(token.text):
@@ -41,8 +100,8 @@ class Tokenizer:
                 spaces.extend([False] * len(tokens))
                 spaces[-1] = bool(token.whitespace_)
             # fix bracket and quote tokenization errors, e.g. `bu"(bir)` -> `bu " ( bir )`
-            elif re.search(fr'{pattern}', token.text):
-                tokens = [t.text for t in self.nlp(re.sub(fr'({pattern})', r' \1 ', token.text))
+            elif _brackets.search(token.text):
+                tokens = [t.text for t in self.nlp(_brackets.sub(r' \1 ', token.text))
                           if not t.is_space]
                 words.extend(tokens)
                 spaces.extend([False] * len(tokens))
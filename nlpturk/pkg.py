@@ -2,3 +2,7 @@ __version__ = '0.0.2'
 __repo__ = 'https://github.com/nlpturk/nlpturk'
 __model__ = 'nlpturk_model'
 __download_url__ = f'{__repo__}/releases/download/v{__version__}/{__model__}-{__version__}-py3-none-any.whl'
+# SHA-256 checksum of the archive at `__download_url__`, pinned when the model is released. 
+# Downloaded models are verified against it, `NLPTURK_MODEL_SHA256` environment variable 
+# is used if not set.
+__model_sha256__ = None
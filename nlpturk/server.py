@@ -0,0 +1,270 @@
+import os
+import json
+import queue
+import signal
+from concurrent.futures import ThreadPoolExecutor
+from http.server import HTTPServer, BaseHTTPRequestHandler
+from typing import Optional, Callable, Tuple, List, Dict, Any
+
+
+def _cost(item: Tuple[str, Optional[Tuple[str, ...]]]) -> int:
+    """
+    Args:
+        item (Tuple[str, Optional[Tuple[str, ...]]]): Text and pipeline components to run.
+
+    Returns:
+        int: Approximate number of tokens of the text.
+    """
+    return len(item[0].split()) or 1
+
+
+def _annotate(items: List[Tuple[str, Optional[Tuple[str, ...]]]]) -> List[Dict[str, Any]]:
+    """Process a batch of texts and convert the documents to JSON serializable dicts.
+
+    Args:
+        items (List[Tuple[str, Optional[Tuple[str, ...]]]]): Texts and pipeline
+            components to run.
+
+    Returns:
+        List[Dict[str, Any]]: Tokens, character offsets of the tokens, lemmas, POS tags
+            and character offsets of the sentences of each text. Annotations of the
+            skipped components are not included. The exception raised while processing 
+            a text is returned in place of its result.
+    """
+    import nlpturk
+
+    results = []
+    for doc in nlpturk._process_items(items):
+        # the error of a group of texts is raised for its requests only
+        if isinstance(doc, Exception):
+            results.append(doc)
+            continue
+        components = doc._doc._.components
+        annotated = {a: components is None or c in components
+                     for a, c in [('lemmas', 'lemmatizer'), ('pos', 'tagger'),
+                                  ('sents', 'sbd')]}
+        attrs = ['text', 'idx'] + [a for a, k in [('lemma', 'lemmas'), ('pos', 'pos')]
+                                   if annotated[k]]
+        arrays = doc.to_arrays(attrs)
+        result = {'tokens': arrays['text'].tolist(), 'idx': arrays['idx'].tolist()}
+        if annotated['lemmas']:
+            result['lemmas'] = arrays['lemma'].tolist()
+        if annotated['pos']:
+            result['pos'] = arrays['pos'].tolist()
+        if annotated['sents']:
+            result['sents'] = [[s.start_char, s.end_char] for s in doc.sents]
+        results.append(result)
+    return results
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Handler of the annotation requests, see `AnnotationServer`.
+    """
+
+    def do_GET(self):
+        if self.path != '/health':
+            return self._send(404, {'error': 'Not found.'})
+        self._send(200, {'status': 'ok', 'queue_size': self.server.batcher.qsize(),
+                         'queue_limit': self.server.queue_limit,
+                         'coalesced': self.server.batcher.coalesced})
+
+    def do_POST(self):
+        if self.path != '/annotate':
+            return self._send(404, {'error': 'Not found.'})
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            texts, components = body['texts'], body.get('components')
+            if not isinstance(texts, list) or not all(isinstance(t, str) for t in texts):
+                raise ValueError('"texts" must be a list of strings.')
+            if components is not None:
+                if not isinstance(components, list) or \
+                        not all(isinstance(c, str) for c in components):
+                    raise ValueError('"components" must be a list of strings.')
+                if self.server.validate is not None:
+                    self.server.validate(components)
+                components = tuple(sorted(components))
+        except (ValueError, KeyError, TypeError) as e:
+            return self._send(400, {'error': f'Invalid request: {e}'})
+
+        futures = []
+        try:
+            for text in texts:
+                futures.append(self.server.batcher.submit((text, components)))
+        except queue.Full:
+            for f in futures:
+                f.cancel()
+            return self._send(503, {'error': 'Server is busy, retry later.'},
+                              {'Retry-After': '1'})
+        try:
+            docs = [f.result() for f in futures]
+        except Exception as e:
+            return self._send(500, {'error': f'{type(e).__name__}: {e}'})
+        self._send(200, {'docs': docs})
+
+    def _send(self, code: int, body: Dict[str, Any],
+              headers: Optional[Dict[str, str]] = None) -> None:
+        """Send a JSON response.
+
+        Args:
+            code (int): HTTP status code.
+            body (Dict[str, Any]): Response body.
+            headers (Optional[Dict[str, str]], optional): Additional headers.
+                Defaults to None.
+        """
+        data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+
+class AnnotationServer(HTTPServer):
+    """HTTP server of nlpTurk annotations. Requests are handled by a pool of worker
+    threads, texts of concurrent requests are grouped into batches bounded by a token
+    budget and processed together, identical texts in flight are processed once.
+    Requests are rejected with 503 status when the queue of texts waiting to be
+    processed is full.
+
+    Endpoints:
+        POST /annotate  Process texts, e.g. `{"texts": ["..."], "components": ["tagger"]}`.
+                        Responds `{"docs": [{"tokens", "idx", "lemmas", "pos", "sents"}]}`.
+        GET /health     Responds status, the number of texts waiting to be processed and 
+                        the number of texts coalesced with an identical text in flight.
+    """
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        process: Callable[[List[Any]], List[Any]] = _annotate,
+        validate: Optional[Callable[[List[str]], Any]] = None,
+        workers: int = 8,
+        queue_limit: int = 1024,
+        max_batch_tokens: int = 2048,
+        max_wait: float = 0.005
+    ) -> None:
+        """
+        Args:
+            address (Tuple[str, int]): Host and port to listen on.
+            process (Callable[[List[Any]], List[Any]], optional): Function that processes
+                a batch of texts and pipeline components, and returns a JSON serializable
+                result for each text. Defaults to nlpTurk annotations.
+            validate (Optional[Callable[[List[str]], Any]], optional): Function that
+                raises ValueError for invalid pipeline components. Defaults to None.
+            workers (int, optional): Number of worker threads handling requests.
+                Defaults to 8.
+            queue_limit (int, optional): Maximum number of texts waiting to be processed.
+                Defaults to 1024.
+            max_batch_tokens (int, optional): Maximum number of tokens in a batch, a
+                longer text is processed alone. Defaults to 2048.
+            max_wait (float, optional): Maximum time in seconds to wait for a batch to
+                fill up. Defaults to 0.005.
+        """
+        from .batcher import MicroBatcher
+
+        if not isinstance(workers, int) or workers < 1:
+            raise ValueError('"workers" must be a positive integer.')
+        if not isinstance(queue_limit, int) or queue_limit < 1:
+            raise ValueError('"queue_limit" must be a positive integer.')
+        self.validate = validate
+        self.queue_limit = queue_limit
+        self.batcher = MicroBatcher(process, max_batch_size=queue_limit, max_wait=max_wait,
+                                    max_batch_cost=max_batch_tokens, cost=_cost,
+                                    max_queue_size=queue_limit, coalesce=True)
+        self._executor = ThreadPoolExecutor(workers, thread_name_prefix='nlpturk-server')
+        super().__init__(address, _Handler)
+
+    def process_request(self, request, client_address):
+        self._executor.submit(self._process_request, request, client_address)
+
+    def _process_request(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+    def server_close(self):
+        super().server_close()
+        self._executor.shutdown(wait=False)
+
+
+def serve(
+    host: str = '127.0.0.1',
+    port: int = 8080,
+    workers: int = 8,
+    queue_limit: int = 1024,
+    max_batch_tokens: int = 2048,
+    max_wait: float = 0.005,
+    processes: int = 1
+) -> None:
+    """Load the model and serve annotations over HTTP until interrupted, see
+    `AnnotationServer`. With multiple processes, the model is loaded and warmed up once,
+    see `nlpturk.preload`, and the worker processes forked afterwards share its memory
+    and accept connections on the same socket.
+
+    Args:
+        host (str, optional): Host to listen on. Defaults to '127.0.0.1'.
+        port (int, optional): Port to listen on. Defaults to 8080.
+        workers (int, optional): Number of worker threads handling requests.
+            Defaults to 8.
+        queue_limit (int, optional): Maximum number of texts waiting to be processed.
+            Defaults to 1024.
+        max_batch_tokens (int, optional): Maximum number of tokens in a batch.
+            Defaults to 2048.
+        max_wait (float, optional): Maximum time in seconds to wait for a batch to
+            fill up. Defaults to 0.005.
+        processes (int, optional): Number of worker processes, each with its own
+            worker threads and queue. Defaults to 1, the model is served by the
+            current process.
+    """
+    import nlpturk
+
+    if not isinstance(processes, int) or processes < 1:
+        raise ValueError('"processes" must be a positive integer.')
+    if processes > 1:
+        nlpturk.preload()
+    else:
+        nlpturk._load()
+    server = AnnotationServer((host, port), validate=nlpturk._disabled, workers=workers,
+                              queue_limit=queue_limit, max_batch_tokens=max_batch_tokens,
+                              max_wait=max_wait)
+    print(f'Serving nlpTurk on http://{host}:{server.server_port}')
+    if processes == 1:
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+        return
+
+    # threads of the server are started after forking
+    pids = []
+    for _ in range(processes):
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGTERM, signal.default_int_handler)
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                os._exit(0)
+        pids.append(pid)
+    print(f'Worker processes: {", ".join(map(str, pids))}')
+    try:
+        for pid in pids:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+                os.waitpid(pid, 0)
+            except (ProcessLookupError, ChildProcessError):
+                pass
+    finally:
+        server.server_close()
@@ -0,0 +1,197 @@
+import os
+import re
+import shutil
+import hashlib
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+from zipfile import ZipFile
+from contextlib import contextmanager
+from typing import Optional, Iterable, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover
+    fcntl = None
+
+
+class ModelStore:
+    """Class that manages a local directory of models. Models are fetched from the mirrors
+    first and from the given URL last. Downloads are resumed from partially downloaded
+    files, verified against a pinned SHA-256 checksum and unpacked atomically. A model is fetched once,
+    concurrent processes wait for the one that fetches it.
+
+    The store directory is set by `NLPTURK_HOME` environment variable, defaults to
+    `~/.cache/nlpturk`. Mirrors are set by `NLPTURK_MIRRORS` environment variable as
+    whitespace separated base URLs, e.g. `file:///mnt/models https://mirror.local/models`.
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        mirrors: Optional[Iterable[str]] = None
+    ) -> None:
+        """
+        Args:
+            path (Optional[Union[str, Path]], optional): Path to the store directory.
+                Defaults to None, set by `NLPTURK_HOME` environment variable.
+            mirrors (Optional[Iterable[str]], optional): Base URLs of the mirrors,
+                models are fetched from `{mirror}/{filename}`. Defaults to None, set by
+                `NLPTURK_MIRRORS` environment variable.
+        """
+        if path is None:
+            path = os.environ.get('NLPTURK_HOME') or \
+                os.path.join(os.path.expanduser('~'), '.cache', 'nlpturk')
+        if mirrors is None:
+            mirrors = os.environ.get('NLPTURK_MIRRORS', '').split()
+        self.path = Path(path)
+        self.mirrors = [m.rstrip('/') for m in mirrors]
+
+    def has(self, url: str) -> bool:
+        """
+        Args:
+            url (str): URL of the model archive.
+
+        Returns:
+            bool: Whether the model is in the store.
+        """
+        return (self.path / self._name(url)).is_dir()
+
+    def get(self, url: str, sha256: Optional[str]) -> Path:
+        """Get the path of a model, fetch the model if it is not in the store.
+
+        Args:
+            url (str): URL of the model archive, i.e. a zip file or wheel.
+            sha256 (Optional[str]): Expected SHA-256 checksum of the archive. Checksums 
+                are not read from the sources, as a tampered source would serve a matching 
+                checksum. Required if the model is fetched.
+
+        Returns:
+            Path: Model path, i.e. the directory containing the model config.
+        """
+        name = self._name(url)
+        target = self.path / name
+        if not target.is_dir():
+            if not sha256 or not re.fullmatch(r'[0-9a-fA-F]{64}', sha256):
+                raise ValueError('A SHA-256 checksum of the model archive is required '
+                                 'to fetch and verify the model.')
+            os.makedirs(self.path, exist_ok=True)
+            with self._lock(name):
+                # the model may be fetched by another process while waiting
+                if not target.is_dir():
+                    archive = self._fetch(url, sha256)
+                    self._unpack(archive, target)
+                    os.remove(archive)
+        configs = sorted(target.rglob('config.cfg'), key=lambda p: len(p.parts))
+        return configs[0].parent if configs else target
+
+    @staticmethod
+    def _name(url: str) -> str:
+        """
+        Args:
+            url (str): URL of the model archive.
+
+        Returns:
+            str: Model name, i.e. the archive filename without extension.
+        """
+        return os.path.splitext(url.rstrip('/').rsplit('/', 1)[-1])[0]
+
+    @contextmanager
+    def _lock(self, name: str) -> Iterator[None]:
+        """Lock a model across processes.
+
+        Args:
+            name (str): Model name.
+        """
+        with open(self.path / f'.{name}.lock', 'w') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _fetch(self, url: str, sha256: str) -> Path:
+        """Download the model archive from the first available source.
+
+        Args:
+            url (str): URL of the model archive.
+            sha256 (str): SHA-256 checksum of the archive.
+
+        Returns:
+            Path: Path to the downloaded archive.
+        """
+        filename = url.rstrip('/').rsplit('/', 1)[-1]
+        part = self.path / f'{filename}.part'
+        errors = []
+        for source in [f'{m}/{filename}' for m in self.mirrors] + [url]:
+            try:
+                self._download(source, part)
+                if self._sha256(part) != sha256.lower():
+                    os.remove(part)
+                    raise ValueError('checksum mismatch')
+            except (OSError, ValueError) as e:
+                errors.append(f'{source}: {e}')
+                continue
+            archive = self.path / filename
+            os.replace(part, archive)
+            return archive
+        raise ValueError('Model could not be fetched from any source.\n' + '\n'.join(errors))
+
+    @staticmethod
+    def _download(source: str, part: Path) -> None:
+        """Download a file, resume from the partially downloaded file if exists.
+
+        Args:
+            source (str): URL of the file.
+            part (Path): Path to the partially downloaded file.
+        """
+        offset = part.stat().st_size if part.exists() else 0
+        headers = {'Range': f'bytes={offset}-'} if offset else {}
+        try:
+            res = urllib.request.urlopen(urllib.request.Request(source, headers=headers),
+                                         timeout=60)
+        except urllib.error.HTTPError as e:
+            # the file is already downloaded
+            if e.code == 416 and offset:
+                return
+            raise
+        with res:
+            # sources ignoring the range, e.g. local files, send the whole file
+            mode = 'ab' if offset and res.getcode() == 206 else 'wb'
+            with open(part, mode) as f:
+                shutil.copyfileobj(res, f, 1024 * 1024)
+
+    @staticmethod
+    def _sha256(path: Path) -> str:
+        """
+        Args:
+            path (Path): File path.
+
+        Returns:
+            str: SHA-256 checksum of the file.
+        """
+        h = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                h.update(block)
+        return h.hexdigest()
+
+    def _unpack(self, archive: Path, target: Path) -> None:
+        """Unpack the model archive into a temporary directory, then move it to the target
+        directory, so that partially unpacked models are never visible.
+
+        Args:
+            archive (Path): Path to the archive.
+            target (Path): Path to the model directory.
+        """
+        tmp = tempfile.mkdtemp(prefix=f'.{target.name}-', dir=self.path)
+        try:
+            with ZipFile(archive) as z:
+                z.extractall(tmp)
+            os.replace(tmp, target)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
@@ -1,14 +1,11 @@
 import os
+import re
 import glob
 import shutil
-import requests
 from pathlib import Path
 from zipfile import ZipFile
 from typing import Iterator, Tuple, Iterable, Union, List, Any
 
-from sklearn.model_selection import train_test_split
-from wasabi import Printer
-
 from .fs import FS
 
 
@@ -55,6 +52,45 @@ def istitle(text: str) -> str:
     return all(word == capitalize(word) for word in text.split())
 
 
+# safe boundaries to split long texts, in the order of preference: 
+# paragraph breaks, line breaks, sentence ends and whitespaces
+_boundaries = [re.compile(p) for p in (r'\n[^\S\n]*\n\s*', r'\n\s*',
+                                         r'[.?!…][)\]}"\'»”’]*\s+', r'\s+')]
+
+
+def chunk_text(text: str, size: int) -> Iterator[Tuple[int, int]]:
+    """Split text into chunks at safe boundaries. Chunks end with the whitespaces of 
+    the boundary, so that no token is split across chunks. A chunk is longer than `size` 
+    characters only if there is no whitespace in it.
+
+    Args:
+        text (str): Text to be splitted.
+        size (int): Maximum number of characters in a chunk.
+
+    Yields:
+        Iterator[Tuple[int, int]]: Yield start and end character offsets, one for each chunk.
+    """
+    if not isinstance(size, int) or size < 1:
+        raise ValueError('"size" must be a positive integer.')
+    start = 0
+    while start < len(text):
+        end = start + size
+        if end < len(text):
+            for pattern in _boundaries:
+                # look for boundaries in the second half of the chunk to avoid tiny chunks
+                m = None
+                for m in pattern.finditer(text, start + size // 2, end):
+                    pass
+                if m:
+                    end = m.end()
+                    break
+            else:
+                m = re.compile(r'\s').search(text, end)
+                end = m.end() if m else len(text)
+        yield start, min(end, len(text))
+        start = end
+
+
 def batch_dataset(data: Iterable[Any], batch_size: int = 1) -> Iterator[Iterable[Any]]:
     """Split dataset into batches. Last batch would not be padded. 
 
@@ -87,6 +123,8 @@ def split_dataset(
         Tuple[Union[List[Any], None], Union[List[Any], None], Union[List[Any], None]]: 
             Splitted train, dev, test sets.
     """
+    from sklearn.model_selection import train_test_split
+
     if not data or not isinstance(data, list):
         raise ValueError('Data must be list of values.')
 
@@ -131,6 +169,8 @@ def fetch_ud_treebanks(output_path: Union[str, Path]) -> None:
     Args:
         output_path (Union[str, Path]): Output path to save fetched UD treebanks.
     """
+    import requests
+
     base_url = 'https://github.com/UniversalDependencies/'
     repos = {
         'atis': 'UD_Turkish-Atis',
@@ -195,6 +235,7 @@ def merge_ud_treebanks(
                 sent.append(line)
             data.append('\n'.join(sent))
 
+    from wasabi import Printer
     msg = Printer()
     msg.info(f'# of sentences: {len(data)}')
 
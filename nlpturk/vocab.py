@@ -0,0 +1,52 @@
+from typing import List
+
+from spacy.vocab import Vocab
+from spacy.vectors import Vectors
+from spacy.language import Language
+
+
+def rotate_vocab(nlp: Language, strings: List[str]) -> Vocab:
+    """Replace the vocabulary of a model with a new one containing only the given strings, 
+    e.g. the strings of the model when it was loaded. Strings and lexemes of the processed 
+    texts are added to the vocabulary permanently, rotating the vocabulary drops them, 
+    so that the memory usage of long-running processes is bounded. 
+
+    Model weights, e.g. hash embeddings, are independent of the vocabulary, as the token 
+    features are hashed from the token texts. Labels of the pipeline components are in 
+    the strings of the model. Documents processed before the rotation keep the old 
+    vocabulary until they are released.
+
+    Args:
+        nlp (Language): spaCy Language object.
+        strings (List[str]): Strings of the new vocabulary.
+
+    Returns:
+        Vocab: New vocabulary.
+    """
+    old = nlp.vocab
+    vocab = Vocab(strings=strings, lex_attr_getters=old.lex_attr_getters,
+                  lookups=old.lookups, writing_system=old.writing_system,
+                  get_noun_chunks=old.get_noun_chunks)
+    # the vectors setter copies the strings of the vectors into the new vocabulary, 
+    # the vector table is shared by a new vectors object of the new strings instead
+    vectors = old.vectors
+    if vectors.mode == 'floret':
+        new = Vectors(strings=vocab.strings, data=vectors.data, name=vectors.name,
+                      mode=vectors.mode, minn=vectors.minn, maxn=vectors.maxn,
+                      hash_count=vectors.hash_count, hash_seed=vectors.hash_seed,
+                      bow=vectors.bow, eow=vectors.eow)
+    else:
+        new = Vectors(strings=vocab.strings, data=vectors.data, name=vectors.name)
+        new.key2row = vectors.key2row
+    vocab.vectors = new
+    nlp.vocab = vocab
+    for _, proc in nlp.pipeline:
+        if hasattr(proc, 'vocab'):
+            proc.vocab = vocab
+    if hasattr(nlp.tokenizer, 'reset'):
+        nlp.tokenizer.reset(vocab)
+    else:
+        # the vocabulary of the spaCy tokenizer is read-only
+        nlp.tokenizer = type(nlp.tokenizer)(vocab).from_bytes(
+            nlp.tokenizer.to_bytes(exclude=['vocab']))
+    return vocab
@@ -0,0 +1,138 @@
+import time
+import queue
+import asyncio
+import threading
+
+import pytest
+
+from nlpturk.batcher import MicroBatcher
+
+
+def test_micro_batches():
+    batches = []
+
+    def process(items):
+        batches.append(items)
+        return [i * 2 for i in items]
+
+    batcher = MicroBatcher(process, max_batch_size=4, max_wait=0.05)
+    futures = [batcher.submit(i) for i in range(10)]
+    # each future resolves to its own result
+    assert [f.result(timeout=5) for f in futures] == [i * 2 for i in range(10)]
+    # items submitted together are grouped, but batches never exceed max_batch_size
+    assert len(batches) < 10
+    assert all(len(b) <= 4 for b in batches)
+    assert [i for b in batches for i in b] == list(range(10))
+
+
+def test_max_wait():
+    batcher = MicroBatcher(lambda items: items, max_batch_size=100, max_wait=0.01)
+    start = time.monotonic()
+    # a single item is not held back until the batch fills up
+    assert batcher.submit('a').result(timeout=5) == 'a'
+    assert time.monotonic() - start < 1
+
+
+def test_exception():
+    def process(items):
+        raise RuntimeError('failed')
+
+    batcher = MicroBatcher(process)
+    with pytest.raises(RuntimeError):
+        batcher.submit(1).result(timeout=5)
+
+    # exceptions returned as results fail their items only
+    batcher = MicroBatcher(lambda items: [ValueError(i) if i < 0 else i for i in items],
+                           max_wait=0.05)
+    futures = [batcher.submit(i) for i in (1, -1, 2)]
+    assert futures[0].result(timeout=5) == 1 and futures[2].result(timeout=5) == 2
+    with pytest.raises(ValueError):
+        futures[1].result(timeout=5)
+
+
+def test_asyncio():
+    threads = set()
+
+    def process(items):
+        threads.add(threading.get_ident())
+        return [i.upper() for i in items]
+
+    batcher = MicroBatcher(process, max_batch_size=8, max_wait=0.01)
+
+    async def main():
+        futures = [asyncio.wrap_future(batcher.submit(t)) for t in 'abcdefghij']
+        return await asyncio.gather(*futures)
+
+    assert asyncio.run(main()) == list('ABCDEFGHIJ')
+    # batches are processed off the event loop thread
+    assert threading.get_ident() not in threads
+    # raises ValueError, if batch bounds are not valid
+    with pytest.raises(ValueError):
+        MicroBatcher(process, max_batch_size=0)
+    with pytest.raises(ValueError):
+        MicroBatcher(process, max_wait=-1)
+
+
+def test_max_batch_cost():
+    batches = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)
+        batches.append(items)
+        return items
+
+    batcher = MicroBatcher(process, max_batch_size=100, max_wait=0.05, max_batch_cost=10,
+                           cost=len, max_queue_size=8)
+    # the first batch holds the processing thread while the others are queued
+    first = batcher.submit('a')
+    time.sleep(0.1)
+    futures = [batcher.submit(t) for t in ['aaaa', 'aaaa', 'aaaa', 'a' * 20, 'aa']]
+    release.set()
+    assert [f.result(timeout=5) for f in [first] + futures] == \
+        ['a', 'aaaa', 'aaaa', 'aaaa', 'a' * 20, 'aa']
+    # batches are bounded by the total cost, items exceeding it are processed alone
+    assert batches == [['a'], ['aaaa', 'aaaa'], ['aaaa'], ['a' * 20], ['aa']]
+
+
+def test_max_queue_size():
+    release = threading.Event()
+    batcher = MicroBatcher(lambda items: release.wait(5) and items, max_batch_size=1,
+                           max_queue_size=2)
+    futures = [batcher.submit(0)]
+    time.sleep(0.1)
+    futures += [batcher.submit(1), batcher.submit(2)]
+    assert batcher.qsize() == 2
+    with pytest.raises(queue.Full):
+        batcher.submit(3)
+    release.set()
+    assert [f.result(timeout=5) for f in futures] == [0, 1, 2]
+    with pytest.raises(ValueError):
+        MicroBatcher(lambda items: items, max_batch_cost=10)
+
+
+def test_coalesce():
+    batches = []
+    release = threading.Event()
+
+    def process(items):
+        release.wait(5)
+        batches.append(items)
+        return [text.upper() for text, _ in items]
+
+    batcher = MicroBatcher(process, max_wait=0.05, coalesce=True)
+    first = batcher.submit(('a', None))
+    time.sleep(0.1)
+    # identical items are attached to the item being processed or waiting
+    futures = [batcher.submit(item) for item in [('a', None), ('b', None), ('a', ('sbd',)),
+                                                 ('b', None), ('a', None)]]
+    futures[1].cancel()
+    release.set()
+    assert first.result(timeout=5) == 'A'
+    assert [f.result(timeout=5) for f in futures if not f.cancelled()] == ['A', 'A', 'B', 'A']
+    # each unique item is processed once, components are part of the item
+    assert batches == [[('a', None)], [('b', None), ('a', ('sbd',))]]
+    assert batcher.coalesced == 3
+    # finished items are processed again
+    assert batcher.submit(('a', None)).result(timeout=5) == 'A'
+    assert len(batches) == 3
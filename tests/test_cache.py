@@ -0,0 +1,82 @@
+import multiprocessing
+
+import pytest
+
+from nlpturk.cache import LRUCache, DiskCache, cache_key
+
+
+def test_cache_key():
+    components = ['tok2vec', 'sbd', 'tagger', 'lemmatizer']
+    assert cache_key('metin', components) == cache_key('metin', components)
+    # keys depend on both the text and the pipeline components
+    assert cache_key('metin', components) != cache_key('metin ', components)
+    assert cache_key('metin', components) != cache_key('metin', ['tok2vec', 'sbd'])
+
+
+def test_lru_cache():
+    # raises ValueError, if memory budget is not a positive integer
+    with pytest.raises(ValueError):
+        LRUCache(0)
+    cache = LRUCache(100)
+    assert cache.get(b'a') is None
+    cache.set(b'a', b'x' * 29)
+    cache.set(b'b', b'y' * 29)
+    cache.set(b'c', b'z' * 29)
+    assert len(cache) == 3
+    # mark `a` as recently used, `b` is evicted first
+    assert cache.get(b'a') == b'x' * 29
+    cache.set(b'd', b'w' * 29)
+    assert cache.get(b'b') is None
+    assert cache.get(b'a') is not None
+    assert cache.info() == {'hits': 2, 'misses': 2, 'entries': 3, 'bytes': 90,
+                            'max_bytes': 100}
+    # values larger than the memory budget are not cached
+    cache.set(b'e', b'v' * 100)
+    assert cache.get(b'e') is None
+    assert len(cache) == 3
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.info()['bytes'] == 0
+
+
+def _read(args):
+    path, keys = args
+    return DiskCache(path, '1.0').get_many(keys)
+
+
+def test_disk_cache(tmp_path):
+    path = tmp_path / 'cache' / 'docs.db'
+    cache = DiskCache(path, '1.0')
+    assert cache.get(b'a') is None
+    cache.set_many([(b'a', b'x'), (b'b', b'y')])
+    assert cache.get_many([b'a', b'c', b'b']) == [b'x', None, b'y']
+    assert cache.info()['hits'] == 2
+    assert cache.info()['misses'] == 2
+    # entries persist across instances of the same version
+    assert DiskCache(path, '1.0').get(b'a') == b'x'
+    # entries are readable from multiple processes concurrently
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Pool(4) as pool:
+        results = pool.map(_read, [(str(path), [b'a', b'b'])] * 8)
+    assert all(r == [b'x', b'y'] for r in results)
+    # entries of the other model versions are not read
+    cache = DiskCache(path, '2.0')
+    assert cache.get(b'a') is None
+    assert cache.info()['entries'] == 0
+
+
+def test_disk_cache_versions(tmp_path):
+    path = tmp_path / 'docs.db'
+    old, new = DiskCache(path, '1.0'), DiskCache(path, '2.0')
+    # processes of both versions keep writing, without wiping the entries of each other
+    old.set(b'a', b'old')
+    new.set(b'a', b'new')
+    old.set(b'b', b'old')
+    assert DiskCache(path, '2.0').get_many([b'a', b'b']) == [b'new', None]
+    assert DiskCache(path, '1.0').get_many([b'a', b'b']) == [b'old', b'old']
+    new.clear()
+    assert old.get(b'a') == b'old'
+    # entries of the unused versions are evicted on writes
+    DiskCache(path, '3.0', max_age=0).set(b'c', b'x')
+    assert old.get_many([b'a', b'b']) == [None, None]
+    assert DiskCache(path, '3.0').get(b'c') == b'x'
@@ -0,0 +1,213 @@
+import gc
+import weakref
+from types import SimpleNamespace
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import numpy as np
+import spacy
+
+import nlpturk
+from nlpturk.doc import Document, _pool
+from nlpturk.pipeline.tokenizer import Tokenizer
+
+
+texts = [
+    'Sosyal medya hayatımıza hızlı girdi.ama yazım kurallarına dikkat eden pek yok :)',
+    '  Baştaki ve sondaki   boşluklar korunur.\n\n',
+    '\tSatır\nsonları  ve\t\tsekmeler (parantez)"tırnak" www.nlpturk.ai adresinde. ',
+    'Tek',
+]
+
+
+@pytest.fixture(scope='module')
+def nlp():
+    nlp = spacy.blank('tr')
+    nlp.tokenizer = Tokenizer(nlp)
+    return nlp
+
+
+def _process(nlp, text):
+    return Document(nlpturk._align(nlp(' '.join(text.split())), text))
+
+
+def _check(doc, text):
+    assert doc.text == text
+    for token in doc:
+        assert text[token.idx:token.idx + len(token)] == token.text
+    # leading whitespaces belong to the first token
+    assert doc[0].text_with_ws.startswith(text[:len(text) - len(text.lstrip())])
+
+
+def test_align(nlp):
+    for text in texts:
+        doc = _process(nlp, text)
+        _check(doc, text)
+        assert doc._doc._.idx.dtype == 'int32'
+        assert doc._doc._.ws.dtype == 'int32'
+    # texts consisting only of whitespaces have no tokens
+    assert len(_process(nlp, ' \n ')) == 0
+
+
+def test_align_threads(nlp):
+    # offsets are stored per document, documents processed concurrently do not 
+    # share offsets
+    data = [f'{i}. {texts[i % len(texts)]}' + ' ' * (i % 3) for i in range(200)]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        docs = list(executor.map(lambda text: _process(nlp, text), data))
+    for doc, text in zip(docs, data):
+        _check(doc, text)
+
+
+def test_to_arrays(nlp):
+    attrs = ['text', 'lemma', 'pos', 'idx', 'is_sent_start', 'is_sent_end', 'is_lower',
+             'is_upper', 'is_title', 'is_stop_word', 'is_punct', 'like_url']
+    for text in texts:
+        spacy_doc = nlp(' '.join(text.split()))
+        if len(spacy_doc) > 3:
+            spacy_doc[3].is_sent_start = True
+            spacy_doc[2]._.sent_end = True
+        doc = Document(nlpturk._align(spacy_doc, text))
+        arrays = doc.to_arrays(attrs)
+        assert list(arrays) == attrs
+        for attr in attrs:
+            assert len(arrays[attr]) == len(doc)
+            assert arrays[attr].tolist() == [getattr(t, attr) for t in doc]
+        ids = doc.to_arrays(['text', 'lemma'], as_ids=True)
+        assert ids['text'].dtype == 'uint64'
+        strings = spacy_doc.vocab.strings
+        assert [strings[int(i)] for i in ids['text']] == arrays['text'].tolist()
+        assert [strings[int(i)] for i in ids['lemma']] == arrays['lemma'].tolist()
+    assert Document(nlp('')).to_arrays(['text', 'is_sent_end'])['text'].size == 0
+    with pytest.raises(ValueError):
+        doc.to_arrays(['unknown'])
+
+
+def test_token_reuse(nlp):
+    doc = _process(nlp, texts[0])
+    assert all(a is b for a, b in zip(doc, doc))
+    assert doc[-1] is list(doc)[-1]
+    assert not hasattr(doc[0], '__dict__')
+    with pytest.raises(ValueError):
+        doc['0']
+
+
+def test_sent_text(nlp):
+    for text in texts:
+        spacy_doc = nlp(' '.join(text.split()))
+        for i in range(1, len(spacy_doc)):
+            spacy_doc[i].is_sent_start = i % 3 == 0
+        doc = Document(nlpturk._align(spacy_doc, text))
+        sents = list(doc.sents)
+        assert ''.join(sent.text_with_ws for sent in sents) == text
+        for sent in sents:
+            assert sent.text == sent.text_with_ws.rstrip()
+            assert sent.text.endswith(text[sent.start_char:sent.end_char])
+            assert sent.start_char == sent[0].idx
+            assert sent.end_char == sent[-1].idx + len(sent[-1])
+
+
+def test_no_reference_cycle(nlp):
+    doc = _process(nlp, texts[2])
+    token, sents = doc[0], list(doc.sents)
+    ref = weakref.ref(doc)
+    gc.disable()
+    try:
+        # freed by reference counting, the token and sentence objects do not 
+        # reference the document
+        del doc
+        assert ref() is None
+    finally:
+        gc.enable()
+    assert token.text == 'Satır' and sents[0][0] is token
+
+
+def test_pool():
+    rng = np.random.default_rng(0)
+    # two spans of four subtokens, overlapping subtokens are aligned to the same token
+    tensor = rng.random((2, 4, 8), dtype='float32')
+    align = [[0, 1], [], [2], [3, 4, 5], [], [6, 7]]
+    lengths = np.array([len(a) for a in align])
+    trf_data = SimpleNamespace(tensors=[tensor], align=SimpleNamespace(
+        dataXd=np.array([i for a in align for i in a]).reshape(-1, 1), lengths=lengths))
+    vectors = _pool(SimpleNamespace(_=SimpleNamespace(trf_data=trf_data)))
+    assert vectors.shape == (len(align), 8) and vectors.dtype == 'float32'
+    flat = tensor.reshape(-1, 8)
+    for i, a in enumerate(align):
+        expected = flat[a].mean(axis=0) if a else np.zeros(8)
+        assert np.allclose(vectors[i], expected)
+
+
+def test_long_doc_trf(monkeypatch):
+    from spacy.language import Language
+    from spacy.tokens.doc import Doc
+
+    if not Doc.has_extension('trf_data'):
+        Doc.set_extension('trf_data', default=None)
+    if 'test_noop' not in Language.factories:
+        Language.component('test_noop', func=lambda doc: doc)
+    # the pipeline has a component named `transformer`, so that vectors are available
+    nlp = spacy.blank('tr')
+    nlp.tokenizer = Tokenizer(nlp)
+    nlp.add_pipe('test_noop', name='transformer')
+    rng = np.random.default_rng(0)
+    expected = []
+
+    def process(texts, batch_size=None, disable=[], nlp=None):
+        # chunks annotated by a transformer with a subtoken for each token
+        for text in texts:
+            doc = nlp(' '.join(text.split()))
+            tensor = rng.random((1, len(doc), 8), dtype='float32')
+            doc._.trf_data = SimpleNamespace(tensors=[tensor], align=SimpleNamespace(
+                dataXd=np.arange(len(doc)).reshape(-1, 1), lengths=np.ones(len(doc), int)))
+            expected.append(tensor[0])
+            yield doc
+
+    monkeypatch.setattr(nlpturk, '_nlp', nlp, raising=False)
+    monkeypatch.setattr(nlpturk, '_process', process)
+    text = ' '.join(texts[0] for _ in range(20))
+    try:
+        nlpturk.configure(chunk_size=100)
+        doc = Document(nlpturk._get_long_doc(text, ['sbd'], 1))
+    finally:
+        nlpturk.configure(chunk_size=100000)
+    assert len(expected) > 1 and doc._doc._.trf_data is None
+    assert np.allclose([t.vector for t in doc], np.concatenate(expected))
+    assert np.allclose(doc.vector, np.concatenate(expected).mean(axis=0))
+
+
+def test_embed_rows(nlp):
+    rng = np.random.default_rng(0)
+    for text in texts:
+        spacy_doc = nlp(' '.join(text.split()))
+        spacy_doc.tensor = rng.random((len(spacy_doc), 4), dtype='float32')
+        for i in range(1, len(spacy_doc)):
+            spacy_doc[i].is_sent_start = i % 3 == 0
+        doc = Document(nlpturk._align(spacy_doc, text))
+        vectors, spans = nlpturk._embed_rows(doc._doc, 'sent')
+        sents = list(doc.sents)
+        assert vectors.shape == (len(sents), 4)
+        for vector, (start, end), sent in zip(vectors, spans, sents):
+            assert np.allclose(vector, sent.vector)
+            assert (start, end) == (sent.start_char, sent.end_char)
+        vectors, spans = nlpturk._embed_rows(doc._doc, 'doc')
+        assert np.allclose(vectors, [doc.vector])
+        assert spans.tolist() == [[doc[0].idx, doc[-1].idx + len(doc[-1])]]
+
+
+def test_vector_dtype(nlp):
+    rng = np.random.default_rng(0)
+    spacy_doc = nlp(' '.join(texts[0].split()))
+    spacy_doc.tensor = rng.standard_normal((len(spacy_doc), 16), dtype='float32')
+    doc32 = Document(nlpturk._align(spacy_doc, texts[0]))
+    vector32 = doc32.vector
+    try:
+        nlpturk.configure(vector_dtype='float16')
+        doc16 = Document(nlpturk._cast_vectors(spacy_doc))
+        assert doc16._doc.tensor.dtype == 'float16'
+        assert doc16[0].vector.dtype == doc16.vector.dtype == 'float16'
+        assert np.allclose(doc16.vector, vector32, atol=1e-2)
+    finally:
+        nlpturk.configure(vector_dtype='float32')
+    with pytest.raises(ValueError):
+        nlpturk.configure(vector_dtype='float64')
@@ -0,0 +1,12 @@
+import sys
+import subprocess
+
+
+def test_lazy_imports():
+    # heavy dependencies are imported on first use
+    code = ('import sys, nlpturk, nlpturk.__main__; '
+            'print(",".join(m for m in sys.modules if m.split(".")[0] in '
+            '("spacy", "thinc", "numpy", "sklearn", "requests", "nltk")))')
+    res = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         check=True)
+    assert res.stdout.strip() == ''
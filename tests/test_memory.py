@@ -0,0 +1,16 @@
+import os
+
+import pytest
+
+from nlpturk.memory import memory_usage
+
+
+@pytest.mark.skipif(not os.path.exists('/proc/self/smaps_rollup'),
+                    reason='requires /proc/<pid>/smaps_rollup')
+def test_memory_usage():
+    usage = memory_usage()
+    assert usage['rss'] > 0
+    assert usage['shared'] + usage['private'] == usage['rss']
+    assert memory_usage(os.getpid())['rss'] > 0
+    with pytest.raises(ValueError):
+        memory_usage(2**31)
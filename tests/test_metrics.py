@@ -0,0 +1,31 @@
+from nlpturk.metrics import Histogram, Stats
+
+
+def test_histogram():
+    h = Histogram()
+    assert h.percentile(50) == 0.0
+    for i in range(1, 1001):
+        h.record(i / 1000)
+    assert h.count == 1000 and h.max == 1.0
+    for q in (50, 95, 99):
+        # estimates are within the relative error of a bucket
+        assert q / 100 <= h.percentile(q) <= q / 100 * 2 ** (1 / h.resolution)
+    assert h.percentile(100) == 1.0
+    # out of range durations are recorded in the edge buckets
+    h.record(0)
+    h.record(1e6)
+    assert h.count == 1002 and h.max == 1e6
+
+
+def test_stats():
+    stats = Stats()
+    for _ in range(10):
+        stats.record('tagger', 0.01, 100)
+    stats.record('sbd', 0.02, 50)
+    summary = stats.summary()
+    assert summary['tagger']['calls'] == 10 and summary['tagger']['tokens'] == 1000
+    assert abs(summary['tagger']['tokens_per_sec'] - 10000) < 1e-6
+    assert 0.01 <= summary['tagger']['p99'] <= 0.011
+    assert summary['sbd']['p50'] == 0.02
+    stats.reset()
+    assert stats.summary() == {}
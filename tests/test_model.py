@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import spacy
+from spacy.training import Example
+
+from nlpturk.model import export_fast, load_fast, is_fast
+
+
+def test_export_fast(tmp_path):
+    nlp = spacy.blank('tr')
+    nlp.add_pipe('tagger')
+    examples = [Example.from_dict(nlp.make_doc('bir iki üç'), {'tags': ['NUM', 'X', 'NUM']})]
+    nlp.initialize(get_examples=lambda: examples)
+    nlp.to_disk(tmp_path / 'model')
+    assert not is_fast(tmp_path / 'model')
+
+    export_fast(tmp_path / 'model', tmp_path / 'fast')
+    assert is_fast(tmp_path / 'fast')
+    fast = load_fast(tmp_path / 'fast')
+    nodes = list(nlp.get_pipe('tagger').model.walk())
+    fast_nodes = list(fast.get_pipe('tagger').model.walk())
+    for node, fast_node in zip(nodes, fast_nodes):
+        for name in node.param_names:
+            if node.has_param(name):
+                assert np.array_equal(node.get_param(name), fast_node.get_param(name))
+    text = 'iki bir üç dört'
+    assert [t.tag_ for t in nlp(text)] == [t.tag_ for t in fast(text)]
+
+
+def test_reload(tmp_path):
+    import nlpturk
+
+    for name, tag in (('a', 'X'), ('b', 'NUM')):
+        nlp = spacy.blank('tr')
+        nlp.add_pipe('tagger')
+        examples = [Example.from_dict(nlp.make_doc('bir iki'), {'tags': [tag, tag]})]
+        nlp.initialize(get_examples=lambda: examples)
+        nlp.to_disk(tmp_path / name)
+
+    nlpturk.configure(model_path=tmp_path / 'a', cache_size=1024**2)
+    try:
+        assert [t.pos for t in nlpturk('bir iki')] == ['X', 'X']
+        docs = nlpturk.pipe(['bir iki'] * 4, batch_size=1)
+        next(docs)
+        nlpturk.reload(tmp_path / 'b')
+        # texts in flight are processed by the old model
+        assert [t.pos for doc in docs for t in doc] == ['X'] * 6
+        # documents of the old model are not served from the cache
+        assert [t.pos for t in nlpturk('bir iki')] == ['NUM', 'NUM']
+        assert nlpturk.cache_info()['memory']['hits'] == 0
+    finally:
+        nlpturk.configure(model_path=None, cache_size=0)
+        del nlpturk._nlp
+
+
+def test_aprocess_components(tmp_path):
+    import asyncio
+    import nlpturk
+
+    nlp = spacy.blank('tr')
+    nlp.add_pipe('tagger')
+    examples = [Example.from_dict(nlp.make_doc('bir iki'), {'tags': ['NUM', 'NUM']})]
+    nlp.initialize(get_examples=lambda: examples)
+    nlp.to_disk(tmp_path / 'model')
+
+    async def main():
+        return await asyncio.gather(nlpturk.aprocess('bir iki', components='tagger'),
+                                    nlpturk.aprocess('iki bir', components=['unknown']),
+                                    nlpturk.aprocess('bir'), return_exceptions=True)
+
+    nlpturk.configure(model_path=tmp_path / 'model')
+    try:
+        tagged, unknown, doc = asyncio.run(main())
+        # invalid components fail their caller only
+        assert isinstance(unknown, ValueError)
+        assert [t.pos for t in tagged] == ['NUM', 'NUM'] and tagged._doc._.components == ['tagger']
+        assert [t.pos for t in doc] == ['NUM']
+    finally:
+        nlpturk.configure(model_path=None)
+        del nlpturk._nlp
+
+
+def test_max_vocab_size(tmp_path):
+    import nlpturk
+
+    nlp = spacy.blank('tr')
+    nlp.add_pipe('tagger')
+    examples = [Example.from_dict(nlp.make_doc('bir iki'), {'tags': ['NUM', 'NUM']})]
+    nlp.initialize(get_examples=lambda: examples)
+    nlp.to_disk(tmp_path / 'model')
+
+    nlpturk.configure(model_path=tmp_path / 'model', max_vocab_size=100)
+    try:
+        nlpturk._load()
+        size = len(nlpturk._nlp.vocab.strings)
+        texts = [f'kelime{i} bir iki' for i in range(1000)]
+        for doc in nlpturk.pipe(texts, batch_size=10):
+            assert [t.pos for t in doc][1:] == ['NUM', 'NUM']
+        # strings of the processed texts are dropped, strings of the model are kept
+        assert len(nlpturk._nlp.vocab.strings) <= size + 100
+        assert 'NUM' in nlpturk._nlp.vocab.strings
+        assert nlpturk._nlp.tokenizer.vocab is nlpturk._nlp.vocab
+        assert nlpturk._nlp.get_pipe('tagger').vocab is nlpturk._nlp.vocab
+
+        # batches of other threads are not processed while the vocabulary is rotated
+        def process(i):
+            texts = [f'kelime{i}_{j} bir iki' for j in range(200)]
+            return [[t.pos for t in doc][1:] for doc in nlpturk.pipe(texts, batch_size=5)]
+
+        with ThreadPoolExecutor(4) as executor:
+            for tags in executor.map(process, range(8)):
+                assert tags == [['NUM', 'NUM']] * 200
+        assert len(nlpturk._nlp.vocab.strings) <= size + 100
+    finally:
+        nlpturk.configure(model_path=None, max_vocab_size=0)
+        del nlpturk._nlp
+
+
+def test_reload_disk_cache(tmp_path):
+    import nlpturk
+    from nlpturk.model import fingerprint
+
+    # retrained models keep the default meta name and version
+    for name, tag in (('a', 'X'), ('b', 'NUM')):
+        nlp = spacy.blank('tr')
+        nlp.add_pipe('tagger')
+        examples = [Example.from_dict(nlp.make_doc('bir iki'), {'tags': [tag, tag]})]
+        nlp.initialize(get_examples=lambda: examples)
+        nlp.to_disk(tmp_path / name)
+    assert fingerprint(tmp_path / 'a') != fingerprint(tmp_path / 'b')
+    assert fingerprint(tmp_path / 'a') == fingerprint(tmp_path / 'a')
+
+    nlpturk.configure(model_path=tmp_path / 'a', disk_cache=tmp_path / 'cache.db')
+    try:
+        assert [t.pos for t in nlpturk('bir iki')] == ['X', 'X']
+        assert nlpturk.cache_info()['disk']['entries'] == 1
+        nlpturk.reload(tmp_path / 'b')
+        # documents cached by the old model are not reused
+        assert [t.pos for t in nlpturk('bir iki')] == ['NUM', 'NUM']
+        assert nlpturk.cache_info()['disk']['hits'] == 0
+    finally:
+        nlpturk.configure(model_path=None, disk_cache=None)
+        del nlpturk._nlp
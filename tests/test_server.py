@@ -0,0 +1,81 @@
+import json
+import time
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from nlpturk.server import AnnotationServer
+
+
+def start(process, **kwargs):
+    server = AnnotationServer(('127.0.0.1', 0), process, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.server_port}'
+
+
+def request(url, body=None):
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    try:
+        with urllib.request.urlopen(url, data=data, timeout=10) as res:
+            return res.getcode(), json.loads(res.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_annotate():
+    batches = []
+
+    def process(items):
+        batches.append(items)
+        return [{'tokens': text.split(), 'components': components}
+                for text, components in items]
+
+    server, url = start(process, max_wait=0.05)
+    try:
+        code, body = request(f'{url}/annotate', {'texts': ['a b', 'c'],
+                                                 'components': ['tagger']})
+        assert code == 200
+        assert body == {'docs': [{'tokens': ['a', 'b'], 'components': ['tagger']},
+                                 {'tokens': ['c'], 'components': ['tagger']}]}
+        # texts of a request are processed in a single batch
+        assert len(batches) == 1
+        assert request(f'{url}/annotate', {'text': 'a'})[0] == 400
+        assert request(f'{url}/annotate', {'texts': [1]})[0] == 400
+        assert request(f'{url}/missing', {'texts': []})[0] == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_backpressure():
+    release = threading.Event()
+
+    def process(items):
+        release.wait(10)
+        return [text for text, _ in items]
+
+    server, url = start(process, queue_limit=2, max_batch_tokens=1)
+    try:
+        # the first text holds the batcher, the next two fill the queue
+        first = threading.Thread(target=request, args=(f'{url}/annotate', {'texts': ['a']}))
+        first.start()
+        while server.batcher.qsize() or not server.batcher._thread:
+            time.sleep(0.01)
+        code, body = request(f'{url}/health')
+        assert code == 200 and body['status'] == 'ok' and body['coalesced'] == 0
+        code, body = request(f'{url}/annotate', {'texts': ['b', 'c', 'd']})
+        assert code == 503
+        assert request(f'{url}/health')[1]['queue_size'] <= 2
+        release.set()
+        first.join(10)
+        assert request(f'{url}/annotate', {'texts': ['e', 'f']}) == (200, {'docs': ['e', 'f']})
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_invalid_settings():
+    with pytest.raises(ValueError):
+        AnnotationServer(('127.0.0.1', 0), lambda items: items, workers=0)
@@ -0,0 +1,102 @@
+import hashlib
+import threading
+from zipfile import ZipFile
+from http.server import ThreadingHTTPServer, SimpleHTTPRequestHandler
+from functools import partial
+
+import pytest
+
+from nlpturk.store import ModelStore
+
+
+filename = 'nlpturk_model-0.0.2-py3-none-any.whl'
+unreachable = f'http://127.0.0.1:9/{filename}'
+
+
+def _archive(path):
+    with ZipFile(path / filename, 'w') as z:
+        z.writestr('nlpturk_model/__init__.py', '')
+        z.writestr('nlpturk_model/nlpturk_model-0.0.2/config.cfg', '[nlp]')
+        z.writestr('nlpturk_model/nlpturk_model-0.0.2/weights', b'\x01' * 100000)
+    return (path / filename).read_bytes()
+
+
+class _RangeHandler(SimpleHTTPRequestHandler):
+    """Serves files with single byte range support, records the requests.
+    """
+    requests = []
+
+    def send_head(self):
+        self.requests.append((self.path, self.headers.get('Range')))
+        data_range = self.headers.get('Range')
+        if not data_range:
+            return super().send_head()
+        path = self.translate_path(self.path)
+        f = open(path, 'rb')
+        f.seek(int(data_range.split('=')[1].rstrip('-')))
+        body = f.read()
+        f.close()
+        self.send_response(206)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_store_mirror(tmp_path):
+    (tmp_path / 'mirror').mkdir()
+    sha256 = hashlib.sha256(_archive(tmp_path / 'mirror')).hexdigest()
+    store = ModelStore(tmp_path / 'store', [(tmp_path / 'mirror').as_uri()])
+    assert not store.has(unreachable)
+    model_path = store.get(unreachable, sha256)
+    assert store.has(unreachable)
+    assert (model_path / 'config.cfg').read_text() == '[nlp]'
+    # no archives or temporary files are left behind
+    assert sorted(p.name for p in (tmp_path / 'store').iterdir() if p.suffix != '.lock') == \
+        ['nlpturk_model-0.0.2-py3-none-any']
+    # the model is not fetched again
+    (tmp_path / 'mirror' / filename).unlink()
+    assert store.get(unreachable, sha256) == model_path
+
+
+def test_store_checksum(tmp_path):
+    (tmp_path / 'mirror').mkdir()
+    _archive(tmp_path / 'mirror')
+    store = ModelStore(tmp_path / 'store', [(tmp_path / 'mirror').as_uri()])
+    with pytest.raises(ValueError, match='checksum mismatch'):
+        store.get(unreachable, sha256='0' * 64)
+    assert not store.has(unreachable)
+    # models are not installed unverified, checksums are not read from the sources
+    (tmp_path / 'mirror' / f'{filename}.sha256').write_text(
+        hashlib.sha256((tmp_path / 'mirror' / filename).read_bytes()).hexdigest())
+    with pytest.raises(ValueError, match='checksum of the model archive is required'):
+        store.get(unreachable, None)
+    assert not store.has(unreachable)
+
+
+def test_store_resume(tmp_path):
+    (tmp_path / 'mirror').mkdir()
+    data = _archive(tmp_path / 'mirror')
+    handler = partial(_RangeHandler, directory=str(tmp_path / 'mirror'))
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        url = f'http://127.0.0.1:{server.server_port}/{filename}'
+        store = ModelStore(tmp_path / 'store', [])
+        # partially downloaded file
+        (tmp_path / 'store').mkdir()
+        (tmp_path / 'store' / f'{filename}.part').write_bytes(data[:1000])
+        # concurrent calls fetch the model once
+        sha256 = hashlib.sha256(data).hexdigest()
+        threads = [threading.Thread(target=store.get, args=(url, sha256)) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert store.has(url)
+        assert _RangeHandler.requests == [(f'/{filename}', 'bytes=1000-')]
+    finally:
+        server.shutdown()
+        server.server_close()
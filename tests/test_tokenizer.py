@@ -1,5 +1,12 @@
+import sys
+import subprocess
+
+import pytest
 import spacy
-from nlpturk.pipeline.tokenizer import Tokenizer
+
+import nlpturk
+from nlpturk.pipeline.tld import TLD
+from nlpturk.pipeline.tokenizer import Tokenizer, _trie_pattern, _url_pattern, _url
 
 
 def test_url_match():
@@ -16,3 +23,64 @@ def test_url_match():
     for url in invalid_urls:
         tokens = [t.text for t in nlp(url)]
         assert len(tokens) > 1
+
+
+def test_url_pattern():
+    assert _trie_pattern(['com', 'co', 'cat', 'c-d']) == r'c(?:\-d|at|om?)'
+    # the trie pattern matches the same urls as the plain alternation of the domains
+    plain = _url_pattern('|'.join(TLD))
+    candidates = []
+    for tld in TLD:
+        for t in (tld, tld[:-1], tld + 'x', tld.upper()):
+            candidates += [f'nlpturk.{t}', f'www.nlpturk.{t}/a(b)', f'x@nlpturk.{t}',
+                           f'http://nlpturk.{t}', f'nlpturk.{t}.']
+    for text in candidates:
+        assert bool(_url.match(text)) == bool(plain.match(text)), text
+
+
+def test_tokenize():
+    text = ' Ankara\'da  yaşıyorum.\nwww.nlpturk.ai adresini ziyaret edin! '
+    doc = nlpturk.tokenize(text)
+    assert [t.text for t in doc] == ['Ankara\'da', 'yaşıyorum', '.', 'www.nlpturk.ai',
+                                     'adresini', 'ziyaret', 'edin', '!']
+    assert [t.idx for t in doc] == [1, 12, 21, 23, 38, 47, 55, 59]
+    assert doc.text == text
+    # model annotations are not available
+    with pytest.raises(ValueError):
+        doc[0].lemma
+    docs = list(nlpturk.tokenize_batch(['Bir iki.', '', '  üç']))
+    assert [[t.text for t in d] for d in docs] == [['Bir', 'iki', '.'], [], ['üç']]
+    assert docs[2][0].idx == 2
+
+
+def test_tokenize_without_model():
+    # the model is not loaded, checked in a new interpreter as other tests may load it
+    code = ('import nlpturk; nlpturk.tokenize("Bir iki."); '
+            'print(hasattr(nlpturk, "_nlp"))')
+    res = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                         check=True)
+    assert res.stdout.strip() == 'False'
+
+
+def test_tokenize_max_vocab_size(monkeypatch):
+    # start from a new tokenizer, strings of the previous tests are not counted
+    monkeypatch.delattr(nlpturk, '_tokenizer', raising=False)
+    texts = [f'kelime{i} kelime{i}ler' for i in range(200)]
+    nlpturk.configure(max_vocab_size=50)
+    try:
+        tokenizers = []
+        for doc in nlpturk.tokenize_batch(texts):
+            tokenizers.append(nlpturk._tokenizer)
+        # the tokenizer is replaced once the added strings exceed the limit, not per text
+        n = len({id(t) for t in tokenizers})
+        assert 1 < n < 50
+        # the limit is checked before each text, strings of the last text are added 
+        # after the check
+        tokenizer = Tokenizer(spacy.blank('tr'))
+        size = len(tokenizer.vocab.strings)
+        tokenizer(texts[-1])
+        last = len(tokenizer.vocab.strings) - size
+        tokenizer = nlpturk._tokenizer
+        assert len(tokenizer.vocab.strings) - nlpturk._tokenizer_strings <= 50 + last
+    finally:
+        nlpturk.configure(max_vocab_size=0)
@@ -1,6 +1,6 @@
 import pytest
 
-from nlpturk.utils import batch_dataset, split_dataset
+from nlpturk.utils import batch_dataset, split_dataset, chunk_text
 
 
 def test_batch_dataset():
@@ -57,3 +57,21 @@ def test_split_dataset():
     # raises ValueError, if split_ratios is not type of list or tuple
     with pytest.raises(ValueError):
         split_dataset(data, split_ratios={0.6, 0.2, 0.2})
+
+
+def test_chunk_text():
+    text = 'Birinci paragraf. İkinci cümle.\n\nİkinci paragraf\nyeni satır  ve  boşluklar.'
+    for size in (1, 5, 20, 40, 100):
+        chunks = [text[s:e] for s, e in chunk_text(text, size)]
+        # chunks cover the whole text
+        assert ''.join(chunks) == text
+        # tokens are not splitted across chunks
+        assert [w for c in chunks for w in c.split()] == text.split()
+    # paragraph breaks are preferred over sentence ends and whitespaces
+    assert [text[s:e] for s, e in chunk_text(text, 40)][0] == \
+        'Birinci paragraf. İkinci cümle.\n\n'
+    # a chunk is longer than size only if there is no whitespace in it
+    assert list(chunk_text('abcdefgh ij', 4)) == [(0, 9), (9, 11)]
+    # raises ValueError, if size is not a positive integer
+    with pytest.raises(ValueError):
+        next(chunk_text(text, 0))